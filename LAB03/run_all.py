@@ -1,22 +1,24 @@
 # run_all.py
 import os
 import pandas as pd
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
 
 # --- Utility: Save CSV as Image ---
 def save_csv_as_image(csv_path, img_path, figsize=(6, 4)):
     df = pd.read_csv(csv_path)
-    fig, ax = plt.subplots(figsize=figsize)
+    # Own Figure/Agg canvas, no pyplot state
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
     ax.axis('off')
     tbl = pd.plotting.table(ax, df, loc='center', cellLoc='center')
     tbl.auto_set_font_size(False)
     tbl.set_fontsize(8)
     tbl.scale(1.2, 1.2)
-    plt.savefig(img_path, bbox_inches='tight')
-    plt.close()
+    fig.savefig(img_path, bbox_inches='tight')
 
 # --- Questions and Folders ---
 questions = {
@@ -31,18 +33,18 @@ questions = {
     "Q9_correlation": "q9_correlation.py",
 }
 
-# --- Loop through all questions ---
-for folder, script in questions.items():
+# --- Run one question ---
+def run_question(folder, script):
     q_dir = os.path.join(os.getcwd(), folder)
     script_path = os.path.join(q_dir, script)
 
     if not os.path.exists(q_dir):
         print(f"⚠️ Skipping {folder}, directory not found.")
-        continue
+        return
 
     if not os.path.exists(script_path):
         print(f"⚠️ Skipping {script}, not found in {q_dir}.")
-        continue
+        return
 
     # Run script inside its folder
     print(f"▶️ Running {script} in {folder} ...")
@@ -55,4 +57,12 @@ for folder, script in questions.items():
             img_path = os.path.join(q_dir, file.replace(".csv", "_table.png"))
             save_csv_as_image(csv_path, img_path)
 
-print("\n✅ All questions executed. Graphs, CSVs, and table images saved inside each Q-folder.")
\ No newline at end of file
+# --- Run all questions in parallel ---
+# One worker process per question: matplotlib is not thread-safe, so the
+# CSV → PNG conversion must not share a process with other renders
+if __name__ == "__main__":
+    with ProcessPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+        for _ in pool.map(run_question, questions.keys(), questions.values()):
+            pass
+
+    print("\n✅ All questions executed. Graphs, CSVs, and table images saved inside each Q-folder.")
\ No newline at end of file
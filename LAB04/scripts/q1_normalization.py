@@ -15,16 +15,13 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import numpy as np
 import pandas as pd
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 
 from src.utils.config import (Q1_OUT_TABLES, Q1_OUT_PLOTS, 
-                            COLORS)
+                            COLORS, ensure_dir)
 from src.data_processing.normalization import (minmax_scaling,
                                              zscore_scaling,
                                              decimal_scaling)
-from src.visualization.plotting import save_hist
+from src.visualization.plotting import save_hist, new_figure, save_figure
 
 def main():
     # Given ages (sorted)
@@ -47,23 +44,21 @@ def main():
         "zscore": zscore,
         "decimal_scaled": dec_scaled
     })
-    df_out.to_csv(os.path.join(Q1_OUT_TABLES, "q1_normalizations.csv"), index=False)
+    df_out.to_csv(os.path.join(ensure_dir(Q1_OUT_TABLES), "q1_normalizations.csv"), index=False)
 
     # Create comparison scatter plot
     x = np.arange(len(ages))
-    plt.figure(figsize=(10, 5.5), dpi=140)
-    plt.scatter(x, ages, label="Original age", s=36, edgecolor="none", c=COLORS["base"])
-    plt.scatter(x, minmax, label="Min-Max [0,1]", s=30, edgecolor="none", c=COLORS["alt1"])
-    plt.scatter(x, zscore, label="Z-score", s=30, edgecolor="none", c=COLORS["alt2"])
-    plt.scatter(x, dec_scaled, label="Decimal scaled", s=30, edgecolor="none", c=COLORS["alt3"])
-    plt.title("Age – Original vs. Normalized", pad=12)
-    plt.xlabel("Tuple index (sorted by age)")
-    plt.ylabel("Value")
-    plt.grid(alpha=0.3, linestyle="--", linewidth=0.7)
-    plt.legend(frameon=True)
-    plt.tight_layout()
-    plt.savefig(os.path.join(Q1_OUT_PLOTS, "q1_scatter_comparison.png"))
-    plt.close()
+    fig, ax = new_figure((10, 5.5))
+    ax.scatter(x, ages, label="Original age", s=36, edgecolor="none", c=COLORS["base"])
+    ax.scatter(x, minmax, label="Min-Max [0,1]", s=30, edgecolor="none", c=COLORS["alt1"])
+    ax.scatter(x, zscore, label="Z-score", s=30, edgecolor="none", c=COLORS["alt2"])
+    ax.scatter(x, dec_scaled, label="Decimal scaled", s=30, edgecolor="none", c=COLORS["alt3"])
+    ax.set_title("Age – Original vs. Normalized", pad=12)
+    ax.set_xlabel("Tuple index (sorted by age)")
+    ax.set_ylabel("Value")
+    ax.grid(alpha=0.3, linestyle="--", linewidth=0.7)
+    ax.legend(frameon=True)
+    save_figure(fig, os.path.join(Q1_OUT_PLOTS, "q1_scatter_comparison.png"))
 
     # Save histograms
     save_hist(pd.Series(ages, name="Age"), 
@@ -18,50 +18,49 @@ Tasks:
 import os
 import sys
 
-# Add the parent directory to Python path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Add the parent directory (src) and the repository root (labtools) to Python path
+LAB04_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(LAB04_DIR)
+sys.path.append(os.path.dirname(LAB04_DIR))
 
-import numpy as np
 import pandas as pd
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 
 from src.utils.config import (Q2_IN_CSV, Q2_OUT_TABLES, Q2_OUT_PLOTS,
-                            COLORS, GRID_KW)
-from src.data_processing.binning import (equal_frequency_bins,
-                                       smooth_by_mean,
-                                       smooth_by_median,
-                                       smooth_by_boundaries)
-from src.data_processing.avocado_processing import (load_and_preprocess_avocado,
+                            PROFILE_DIR, CACHE_DIR, COLORS, ensure_dir)
+from src.data_processing.incremental_binning import IncrementalBinning
+from src.data_processing.avocado_processing import (load_avocado_typed,
                                                    get_time_aggregations,
                                                    impute_by_region_mean,
                                                    map_date_to_category)
-from src.visualization.plotting import (save_bar, save_line, save_hist,
-                                      save_smoothing_plot)
-
+from labtools.cache import cached_load
+from labtools.instrumentation import instrumented, stage, write_report
+from labtools.table_io import table_path, write_table
+from src.utils.pipeline import Pipeline
+from src.utils.render_cache import cached_render
+from src.data_processing.histogram import HistogramAccumulator
+from src.visualization.plotting import (save_bar, new_figure, save_figure,
+                                      plot_hist_counts)
+from src.visualization.batch import chart, render_batch
+
+@instrumented
 def process_equal_frequency_binning(df):
     """Process equal-frequency binning and smoothing."""
     # Get Total Volume data
     tv = df["total_volume"].astype(float).dropna().values
     nbins = min(250, max(1, len(tv)))
     
-    # Create equal frequency bins
-    bins = equal_frequency_bins(tv, nbins)
-    
-    # Get the sorted version for visualization
-    tv_sorted = np.sort(tv)
-    
-    # Apply smoothing methods
-    smooth_means = smooth_by_mean(tv, bins)
-    smooth_medians = smooth_by_median(tv, bins)
-    smooth_bounds = smooth_by_boundaries(tv, bins)
+    # Sorted values kept across runs: when rows were only appended since
+    # the last run, just the new rows are merged in
+    state, changed = IncrementalBinning.refresh(
+        os.path.join(CACHE_DIR, "binning", "q2_total_volume"), tv, nbins)
+    print(f"Binning: {len(changed)} of {nbins} bins changed")
     
-    # Sort smoothed results in same order as original for visualization
-    sort_idx = np.argsort(tv)
-    smooth_means_sorted = smooth_means[sort_idx]
-    smooth_medians_sorted = smooth_medians[sort_idx]
-    smooth_bounds_sorted = smooth_bounds[sort_idx]
+    # Smoothed values, in sorted order, over exact equal-frequency bins (the
+    # same as equal_frequency_bins, whatever the history of the cached state)
+    tv_sorted, smoothed = state.smoothed(("mean", "median", "boundaries"), exact=True)
+    smooth_means_sorted = smoothed["mean"]
+    smooth_medians_sorted = smoothed["median"]
+    smooth_bounds_sorted = smoothed["boundaries"]
     
     # Save results
     df_smooth = pd.DataFrame({
@@ -71,36 +70,36 @@ def process_equal_frequency_binning(df):
         "smooth_bin_median": smooth_medians_sorted,
         "smooth_bin_boundaries": smooth_bounds_sorted
     })
-    df_smooth.to_csv(os.path.join(Q2_OUT_TABLES, "q2a_total_volume_binning_and_smoothing.csv"), index=False)
-
-    # Create plots
-    # Plot original data distribution
-    plt.figure(figsize=(9.5, 5.3), dpi=140)
-    plt.hist(tv_sorted, bins=40, edgecolor="#333333", alpha=0.9, color=COLORS["alt2"])
-    plt.title("Distribution of Total Volume (Original Data)", pad=12)
-    plt.xlabel("Total Volume")
-    plt.ylabel("Frequency")
-    plt.grid(**GRID_KW)
-    plt.tight_layout()
-    plt.savefig(os.path.join(Q2_OUT_PLOTS, "q2a_total_volume_hist.png"))
-    plt.close()
-    
-    # Create line plots to show the smoothing effects
-    save_smoothing_plot(tv_sorted, smooth_means_sorted,
-                       "Smoothed by Bin Means", COLORS["alt1"],
-                       os.path.join(Q2_OUT_PLOTS, "q2a_smoothing_bin_means.png"))
-    
-    save_smoothing_plot(tv_sorted, smooth_medians_sorted,
-                       "Smoothed by Bin Medians", COLORS["alt2"],
-                       os.path.join(Q2_OUT_PLOTS, "q2a_smoothing_bin_medians.png"))
-    
-    save_smoothing_plot(tv_sorted, smooth_bounds_sorted,
-                       "Smoothed by Bin Boundaries", COLORS["alt3"],
-                       os.path.join(Q2_OUT_PLOTS, "q2a_smoothing_bin_boundaries.png"))
-
-def process_time_aggregations(df):
-    """Process and save time-based aggregations."""
-    annual_total, monthly_total, annual_by_region, monthly_by_region = get_time_aggregations(df)
+    write_table(df_smooth, os.path.join(Q2_OUT_TABLES, "q2a_total_volume_binning_and_smoothing.csv"))
+
+    # Create plots (rendered in parallel)
+    render_batch([
+        # Plot original data distribution (drawn from the bin counts)
+        chart("hist_counts", HistogramAccumulator.from_values(tv, bins=40),
+              "Distribution of Total Volume (Original Data)", "Total Volume",
+              os.path.join(Q2_OUT_PLOTS, "q2a_total_volume_hist.png")),
+        # Create line plots to show the smoothing effects
+        chart("smoothing", tv_sorted, smooth_means_sorted,
+              "Smoothed by Bin Means", COLORS["alt1"],
+              os.path.join(Q2_OUT_PLOTS, "q2a_smoothing_bin_means.png")),
+        chart("smoothing", tv_sorted, smooth_medians_sorted,
+              "Smoothed by Bin Medians", COLORS["alt2"],
+              os.path.join(Q2_OUT_PLOTS, "q2a_smoothing_bin_medians.png")),
+        chart("smoothing", tv_sorted, smooth_bounds_sorted,
+              "Smoothed by Bin Boundaries", COLORS["alt3"],
+              os.path.join(Q2_OUT_PLOTS, "q2a_smoothing_bin_boundaries.png")),
+    ])
+
+@instrumented
+def process_time_aggregations(df, split_weeks=False):
+    """
+    Process and save time-based aggregations.
+
+    With `split_weeks` each weekly row is apportioned to the months its days
+    fall in instead of counting whole in the month of its date.
+    """
+    annual_total, monthly_total, annual_by_region, monthly_by_region = get_time_aggregations(
+        df, split_weeks=split_weeks)
 
     # Save results
     annual_total.to_csv(os.path.join(Q2_OUT_TABLES, "q2b_annual_total_volume_overall.csv"))
@@ -108,21 +107,24 @@ def process_time_aggregations(df):
     annual_by_region.to_csv(os.path.join(Q2_OUT_TABLES, "q2b_annual_total_volume_by_region.csv"), index=False)
     monthly_by_region.to_csv(os.path.join(Q2_OUT_TABLES, "q2b_monthly_total_volume_by_region.csv"), index=False)
 
-    # Create plots
-    save_bar(annual_total,
-            "Annual Total Volume (overall)",
-            "Year", "Total Volume",
-            os.path.join(Q2_OUT_PLOTS, "q2b_annual_total_overall.png"))
-    
     # For monthly, plot as line by chronological order
     monthly_total_indexed = monthly_total.copy()
     monthly_total_indexed.index = pd.to_datetime(monthly_total_indexed.index)
     monthly_total_indexed = monthly_total_indexed.sort_index()
-    save_line(monthly_total_indexed,
-             "Monthly Total Volume (overall)",
-             "Month", "Total Volume",
-             os.path.join(Q2_OUT_PLOTS, "q2b_monthly_total_overall.png"))
 
+    # Create plots (rendered in parallel)
+    render_batch([
+        chart("bar", annual_total,
+              "Annual Total Volume (overall)",
+              "Year", "Total Volume",
+              os.path.join(Q2_OUT_PLOTS, "q2b_annual_total_overall.png")),
+        chart("line", monthly_total_indexed,
+              "Monthly Total Volume (overall)",
+              "Month", "Total Volume",
+              os.path.join(Q2_OUT_PLOTS, "q2b_monthly_total_overall.png")),
+    ])
+
+@instrumented
 def process_missing_values(df):
     """Analyze and visualize missing values."""
     na_counts = df.isna().sum().sort_values(ascending=False)
@@ -135,39 +137,44 @@ def process_missing_values(df):
             os.path.join(Q2_OUT_PLOTS, "q2c_missing_values_bar.png"),
             rotate=60)
 
+@cached_render
+def save_imputation_hist(hist_before, hist_after, outpath):
+    """Overlay the AveragePrice histograms before and after imputation."""
+    fig, ax = new_figure((10, 5.2))
+    plot_hist_counts(ax, hist_before, alpha=0.75, label="Before (non-missing)", color=COLORS["base"])
+    plot_hist_counts(ax, hist_after, alpha=0.55, label="After Imputation", color=COLORS["alt1"])
+    ax.set_title("AveragePrice – Before vs After Region-Mean Imputation", pad=12)
+    ax.set_xlabel("AveragePrice")
+    ax.set_ylabel("Frequency")
+    ax.legend(frameon=True)
+    ax.grid(alpha=0.3, linestyle="--", linewidth=0.7)
+    save_figure(fig, outpath)
+
+@instrumented
 def process_price_imputation(df):
     """Impute missing prices and visualize results."""
-    df_before_imp = df.copy()
+    # Counts before imputation; the "after" histogram only adds the filled values
+    missing = df["averageprice"].isna().to_numpy()
+    hist_before = HistogramAccumulator.from_values(df["averageprice"].to_numpy(dtype=float), bins=40)
     df_imputed = impute_by_region_mean(df)
+    hist_after = hist_before.copy().update(df_imputed["averageprice"].to_numpy(dtype=float)[missing])
     
-    # Save imputed dataset
-    df_imputed.to_csv(os.path.join(Q2_OUT_TABLES, "q2d_dataset_imputed_averageprice_by_region.csv"),
-                      index=False)
+    # Save imputed dataset (in the configured TABLE_FORMAT)
+    write_table(df_imputed, os.path.join(Q2_OUT_TABLES, "q2d_dataset_imputed_averageprice_by_region.csv"))
 
     # Visualize pre vs post imputation
-    plt.figure(figsize=(10, 5.2), dpi=140)
-    plt.hist(df_before_imp["averageprice"].dropna(), bins=40, alpha=0.75,
-            label="Before (non-missing)", edgecolor="#333333", color=COLORS["base"])
-    plt.hist(df_imputed["averageprice"].dropna(), bins=40, alpha=0.55,
-            label="After Imputation", edgecolor="#333333", color=COLORS["alt1"])
-    plt.title("AveragePrice – Before vs After Region-Mean Imputation", pad=12)
-    plt.xlabel("AveragePrice")
-    plt.ylabel("Frequency")
-    plt.legend(frameon=True)
-    plt.grid(alpha=0.3, linestyle="--", linewidth=0.7)
-    plt.tight_layout()
-    plt.savefig(os.path.join(Q2_OUT_PLOTS, "q2d_averageprice_imputation_hist.png"))
-    plt.close()
+    save_imputation_hist(hist_before, hist_after,
+                         os.path.join(Q2_OUT_PLOTS, "q2d_averageprice_imputation_hist.png"))
     
     return df_imputed
 
+@instrumented
 def process_date_categorization(df):
     """Categorize dates and visualize results."""
     df_categorized = map_date_to_category(df)
     
-    # Save categorized dataset
-    df_categorized.to_csv(os.path.join(Q2_OUT_TABLES, "q2e_dataset_with_date_category.csv"),
-                         index=False)
+    # Save categorized dataset (in the configured TABLE_FORMAT)
+    write_table(df_categorized, os.path.join(Q2_OUT_TABLES, "q2e_dataset_with_date_category.csv"))
 
     # Plot category counts
     cat_counts = df_categorized["date_category"].value_counts(dropna=False)
@@ -176,16 +183,50 @@ def process_date_categorization(df):
             "Date Category", "Count",
             os.path.join(Q2_OUT_PLOTS, "q2e_date_category_counts.png"))
 
-def main():
-    # Load and preprocess data
-    df = load_and_preprocess_avocado(Q2_IN_CSV)
+def build_pipeline():
+    """Declare the Q2 stages, their inputs and the files they write."""
+    tables = lambda *names: [os.path.join(Q2_OUT_TABLES, n) for n in names]
+    plots = lambda *names: [os.path.join(Q2_OUT_PLOTS, n) for n in names]
+    pipeline = Pipeline("q2")
+    pipeline.add(process_equal_frequency_binning,
+                 outputs=[table_path(p) for p in tables("q2a_total_volume_binning_and_smoothing.csv")] +
+                 plots("q2a_total_volume_hist.png", "q2a_smoothing_bin_means.png",
+                       "q2a_smoothing_bin_medians.png", "q2a_smoothing_bin_boundaries.png"))
+    pipeline.add(process_time_aggregations,
+                 outputs=tables("q2b_annual_total_volume_overall.csv",
+                                "q2b_monthly_total_volume_overall.csv",
+                                "q2b_annual_total_volume_by_region.csv",
+                                "q2b_monthly_total_volume_by_region.csv") +
+                 plots("q2b_annual_total_overall.png", "q2b_monthly_total_overall.png"))
+    pipeline.add(process_missing_values,
+                 outputs=tables("q2c_missing_values_summary.csv") +
+                 plots("q2c_missing_values_bar.png"))
+    pipeline.add(process_price_imputation, provides="df_imputed",
+                 outputs=[table_path(p) for p in tables("q2d_dataset_imputed_averageprice_by_region.csv")] +
+                 plots("q2d_averageprice_imputation_hist.png"))
+    pipeline.add(process_date_categorization, inputs=["df_imputed"],
+                 outputs=[table_path(p) for p in tables("q2e_dataset_with_date_category.csv")] +
+                 plots("q2e_date_category_counts.png"))
+    return pipeline
+
+def main(max_workers=None, force=False):
+    # The stages write their tables into this directory
+    ensure_dir(Q2_OUT_TABLES)
+    
+    # Load and preprocess data (served from the columnar cache when unchanged)
+    with stage("load_avocado") as s:
+        df = cached_load(load_avocado_typed, Q2_IN_CSV, CACHE_DIR, float_dtype="float64")
+        s.rows_out = len(df)
+    
+    # Independent stages run in parallel; unchanged ones are skipped
+    _, skipped = build_pipeline().run(max_workers=max_workers, force=force, df=df)
+    if skipped:
+        print("Up to date, skipped:", ", ".join(skipped))
     
-    # Process each task
-    process_equal_frequency_binning(df)
-    process_time_aggregations(df)
-    process_missing_values(df)
-    df_imputed = process_price_imputation(df)
-    process_date_categorization(df_imputed)
+    # Per-stage timing / memory report (only with STAGE_PROFILE=1)
+    report = write_report("q2", PROFILE_DIR)
+    if report:
+        print("Stage report:", report[0])
     
     print("Q2 done. Outputs saved under:", Q2_OUT_PLOTS)
 
@@ -0,0 +1,155 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+class AggregateStore:
+    """
+    Materialized region x type x week aggregates with prefix-sum indexes.
+
+    For every measure column the store keeps, per (region, type, week) cell,
+    the sum and the non-null count, together with running (prefix) totals
+    along the week axis. A total or mean over any week range for any region
+    and type is then a difference of two prefix entries instead of a scan
+    over the raw rows. New weeks are appended by extending the prefix sums
+    from the last stored week.
+
+    Args:
+        columns: Measure columns to aggregate
+    """
+
+    def __init__(self, columns=("total_volume", "averageprice")):
+        self.columns = list(columns)
+        self.regions = []
+        self.types = []
+        self.weeks = np.empty(0, dtype="datetime64[D]")
+        self.sums = {c: np.zeros((0, 0, 0)) for c in self.columns}
+        self.counts = {c: np.zeros((0, 0, 0)) for c in self.columns}
+        self._prefix_sums = {}
+        self._prefix_counts = {}
+
+    @classmethod
+    def from_frame(cls, df, columns=("total_volume", "averageprice")):
+        """Build the store from preprocessed avocado rows."""
+        store = cls(columns)
+        store.append(df)
+        return store
+
+    def _grow(self, regions, types, weeks):
+        """Extend the cell arrays with new regions, types and weeks (padding zeros)."""
+        new_regions = [r for r in regions if r not in set(self.regions)]
+        new_types = [t for t in types if t not in set(self.types)]
+        new_weeks = np.setdiff1d(weeks, self.weeks)
+        if not (new_regions or new_types or len(new_weeks)):
+            return None
+        all_weeks = np.union1d(self.weeks, new_weeks)
+        week_pos = np.searchsorted(all_weeks, self.weeks)
+        shape = (len(self.regions) + len(new_regions), len(self.types) + len(new_types), len(all_weeks))
+        for arrays in (self.sums, self.counts):
+            for c in self.columns:
+                grown = np.zeros(shape)
+                grown[:len(self.regions), :len(self.types)][:, :, week_pos] = arrays[c]
+                arrays[c] = grown
+        self.regions += new_regions
+        self.types += new_types
+        self.weeks = all_weeks
+        if new_regions or new_types:
+            return 0
+        # Only weeks from the earliest inserted one onwards need new prefix entries
+        return int(np.searchsorted(all_weeks, new_weeks.min()))
+
+    def _update_prefix(self, first_week):
+        """Recompute prefix sums from week index `first_week` onwards."""
+        for arrays, prefix in ((self.sums, self._prefix_sums), (self.counts, self._prefix_counts)):
+            for c in self.columns:
+                old = prefix.get(c)
+                shape = arrays[c].shape[:2] + (arrays[c].shape[2] + 1,)
+                if old is None or old.shape[:2] != shape[:2] or first_week == 0:
+                    new = np.zeros(shape)
+                    np.cumsum(arrays[c], axis=2, out=new[:, :, 1:])
+                else:
+                    new = np.zeros(shape)
+                    new[:, :, :first_week + 1] = old[:, :, :first_week + 1]
+                    new[:, :, first_week + 1:] = (old[:, :, first_week:first_week + 1] +
+                                                  np.cumsum(arrays[c][:, :, first_week:], axis=2))
+                prefix[c] = new
+
+    def append(self, df):
+        """
+        Fold new rows (typically one or more new weeks) into the store.
+
+        Rows for weeks already in the store are added to their cells; prefix
+        sums are only rebuilt from the earliest affected week onwards.
+        """
+        rows = df.dropna(subset=["date", "region", "type"])
+        weeks = rows["date"].to_numpy().astype("datetime64[D]")
+        if len(rows) == 0:
+            return self
+        regions = pd.unique(rows["region"]).tolist()
+        types = pd.unique(rows["type"]).tolist()
+        grown_from = self._grow(regions, types, np.unique(weeks))
+
+        r = pd.Index(self.regions).get_indexer(rows["region"])
+        t = pd.Index(self.types).get_indexer(rows["type"])
+        w = np.searchsorted(self.weeks, weeks)
+        flat = np.ravel_multi_index((r, t, w), self.sums[self.columns[0]].shape)
+        for c in self.columns:
+            values = pd.to_numeric(rows[c], errors="coerce").to_numpy(dtype=float)
+            present = ~np.isnan(values)
+            # Scatter-add into the touched cells only
+            np.add.at(self.sums[c].reshape(-1), flat[present], values[present])
+            np.add.at(self.counts[c].reshape(-1), flat[present], 1)
+
+        first_week = int(w.min())
+        if grown_from is not None:
+            first_week = min(first_week, grown_from)
+        self._update_prefix(first_week)
+        return self
+
+    def _week_range(self, start, end):
+        lo = 0 if start is None else np.searchsorted(self.weeks, np.datetime64(start, "D"), side="left")
+        hi = len(self.weeks) if end is None else np.searchsorted(self.weeks, np.datetime64(end, "D"), side="right")
+        return lo, max(lo, hi)
+
+    def _select(self, names, value):
+        if value is None:
+            return slice(None)
+        return names.index(value)
+
+    def total(self, column="total_volume", start=None, end=None, region=None, type_=None):
+        """Sum of `column` over weeks in [start, end] (inclusive), optionally for one region/type."""
+        lo, hi = self._week_range(start, end)
+        prefix = self._prefix_sums[column][self._select(self.regions, region), self._select(self.types, type_)]
+        return float(np.sum(prefix[..., hi] - prefix[..., lo]))
+
+    def count(self, column="total_volume", start=None, end=None, region=None, type_=None):
+        """Number of non-null `column` values in the range."""
+        lo, hi = self._week_range(start, end)
+        prefix = self._prefix_counts[column][self._select(self.regions, region), self._select(self.types, type_)]
+        return int(np.sum(prefix[..., hi] - prefix[..., lo]))
+
+    def mean(self, column="averageprice", start=None, end=None, region=None, type_=None):
+        """Mean of `column` over the rows in the range (e.g. mean price)."""
+        n = self.count(column, start, end, region, type_)
+        return self.total(column, start, end, region, type_) / n if n else float("nan")
+
+    def save(self, path):
+        """Persist the store to an .npz file."""
+        arrays = {f"sum__{c}": self.sums[c] for c in self.columns}
+        arrays.update({f"count__{c}": self.counts[c] for c in self.columns})
+        meta = {"columns": self.columns, "regions": self.regions, "types": self.types}
+        np.savez(path, weeks=self.weeks.astype(np.int64), meta=np.array(json.dumps(meta)), **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Load a store written by `save` and rebuild its prefix sums."""
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            store = cls(meta["columns"])
+            store.regions, store.types = meta["regions"], meta["types"]
+            store.weeks = data["weeks"].astype("datetime64[D]")
+            for c in store.columns:
+                store.sums[c] = data[f"sum__{c}"]
+                store.counts[c] = data[f"count__{c}"]
+        store._update_prefix(0)
+        return store
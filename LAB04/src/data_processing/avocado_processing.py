@@ -1,20 +1,68 @@
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
 
-def load_and_preprocess_avocado(file_path):
-    """Load and preprocess avocado dataset."""
+from .normalization import scale_columns, grouped_scaling
+from .resampling import resample_weekly
+from .discretization import DATE_CATEGORY_RANGES, discretize, discretize_hierarchy
+
+# Numeric measure columns after name normalization
+AVOCADO_NUMERIC_COLUMNS = ["averageprice", "total_volume", "4046", "4225", "4770",
+                           "total_bags", "small_bags", "large_bags", "xlarge_bags"]
+
+# Explicit schema of the avocado CSV, keyed by normalized column name.
+# "averageprice" contains stray non-numeric entries, so it is read as text
+# and coerced afterwards.
+AVOCADO_SCHEMA = {
+    "date": "category",
+    "averageprice": "str",
+    "total_volume": "float32",
+    "4046": "float32",
+    "4225": "float32",
+    "4770": "float32",
+    "total_bags": "float32",
+    "small_bags": "float32",
+    "large_bags": "float32",
+    "xlarge_bags": "float32",
+    "type": "category",
+    "year": "int16",
+    "region": "category",
+}
+
+def _normalize_column_name(c):
+    return c.strip().replace(" ", "_").replace("-", "_").lower()
+
+def parse_dates(dates):
+    """Parse day-first dates like "27-12-2015", once per distinct string."""
     # Date in input is day-first like "27-12-2015"
-    parse_date = lambda s: pd.to_datetime(s, format="%d-%m-%Y", errors="coerce")
-    
+    if not isinstance(dates.dtype, pd.CategoricalDtype):
+        dates = dates.astype("category")
+    parsed = pd.to_datetime(dates.cat.categories, format="%d-%m-%Y", errors="coerce")
+    # Missing dates have code -1, which picks the trailing NaT; this also
+    # covers a column without any valid date (no categories at all)
+    lookup = np.append(parsed.values, np.array(["NaT"], dtype=parsed.values.dtype))
+    values = lookup.take(dates.cat.codes.to_numpy())
+    return pd.Series(values, index=dates.index, name=dates.name)
+
+def load_and_preprocess_avocado(file_path, columns=None):
+    """Load and preprocess avocado dataset, optionally only the given (normalized) columns."""
     # Read data
-    df = pd.read_csv(file_path)
-    
+    usecols = None if columns is None else (lambda c: _normalize_column_name(c) in columns)
+    df = pd.read_csv(file_path, usecols=usecols)
+    return preprocess_avocado_frame(df)
+
+def preprocess_avocado_frame(df):
+    """Normalize column names, parse dates and coerce numerics of a raw avocado frame."""
     # Normalize column names
-    df.columns = [c.strip().replace(" ", "_").replace("-", "_").lower() for c in df.columns]
+    df.columns = [_normalize_column_name(c) for c in df.columns]
     
     # Parse date
     if "date" in df.columns:
-        df["date"] = df["date"].apply(parse_date)
+        df["date"] = parse_dates(df["date"])
     
     # Ensure numeric
     if "averageprice" in df.columns:
@@ -24,24 +72,162 @@ def load_and_preprocess_avocado(file_path):
     
     return df
 
-def get_time_aggregations(df):
-    """Compute monthly and annual aggregations of total volume."""
-    df_valid_dates = df.dropna(subset=["date"])
-    df_valid_dates["year"] = df_valid_dates["date"].dt.year
-    df_valid_dates["month"] = df_valid_dates["date"].dt.to_period("M").astype(str)
+def load_avocado_typed(file_path, columns=None, float_dtype="float32"):
+    """
+    Load the avocado dataset with an explicit, compact schema.
 
-    # Overall annual total
-    annual_total = df_valid_dates.groupby("year")["total_volume"].sum().sort_index()
-    
-    # Overall monthly total (year-month)
-    monthly_total = df_valid_dates.groupby("month")["total_volume"].sum().sort_index()
-    
-    # Per-region annual total
-    annual_by_region = df_valid_dates.groupby(["region", "year"])["total_volume"].sum().reset_index()
-    
-    # Per-region monthly total
-    monthly_by_region = df_valid_dates.groupby(["region", "month"])["total_volume"].sum().reset_index()
-    
+    Region, type and the raw date strings are read as categoricals, volume
+    and bag columns as `float_dtype` (float32 by default) and year as int16;
+    dates are parsed once per distinct string. `columns` optionally
+    restricts the load to the given normalized column names.
+    """
+    float_dtype = np.dtype(float_dtype)
+    header = pd.read_csv(file_path, nrows=0).columns
+    names = {c: _normalize_column_name(c) for c in header}
+    if columns is not None:
+        names = {c: n for c, n in names.items() if n in columns}
+    dtypes = {c: (float_dtype if AVOCADO_SCHEMA[n] == "float32" else AVOCADO_SCHEMA[n])
+              for c, n in names.items() if n in AVOCADO_SCHEMA}
+
+    try:
+        df = pd.read_csv(file_path, usecols=list(names), dtype=dtypes)
+    except ValueError:
+        # Some numeric column holds non-numeric text; coerce it below instead
+        text_dtypes = {c: (d if d == "category" else "str") for c, d in dtypes.items()}
+        df = pd.read_csv(file_path, usecols=list(names), dtype=text_dtypes)
+    df.columns = [names[c] for c in df.columns]
+
+    for col in df.columns:
+        target = AVOCADO_SCHEMA.get(col)
+        if col == "date":
+            df[col] = parse_dates(df[col])
+        elif target in ("str", "float32") and df[col].dtype != float_dtype:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(float_dtype)
+        elif target == "int16" and df[col].dtype != np.int16:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int16")
+    return df
+
+def iter_avocado_column(file_path, column="total_volume", chunksize=100_000):
+    """Stream one numeric column of the avocado CSV in chunks of `chunksize` rows."""
+    reader = pd.read_csv(file_path, usecols=lambda c: _normalize_column_name(c) == column,
+                         chunksize=chunksize)
+    for chunk in reader:
+        yield pd.to_numeric(chunk.iloc[:, 0], errors="coerce").to_numpy(dtype=float)
+
+def build_region_month_cube(df, columns=("total_volume",)):
+    """
+    Aggregate the raw rows once into a small region x month cube.
+
+    Months are integer codes (year * 12 + month - 1), so no string periods
+    are built. For every value column the cube holds its sum and non-null
+    count per cell, which is enough to derive sums, counts and means at
+    any coarser level. Rows without a region keep a NaN region cell so
+    overall totals still include them.
+    """
+    dates = df["date"]
+    valid = dates.notna().to_numpy()
+    month_code = (dates.dt.year * 12 + dates.dt.month - 1).to_numpy()[valid].astype(np.int64)
+    region_code, regions = pd.factorize(df["region"].to_numpy()[valid], sort=True,
+                                        use_na_sentinel=False)
+
+    # Single integer cell key, so the grouping runs on one int64 column
+    first_month = month_code.min() if len(month_code) else 0
+    n_months = month_code.max() - first_month + 1 if len(month_code) else 1
+    cell = region_code.astype(np.int64) * n_months + (month_code - first_month)
+
+    base = pd.DataFrame({"rows": np.ones(len(cell), dtype=np.int64)})
+    for col in columns:
+        values = df[col].to_numpy()[valid]
+        base[f"{col}_sum"] = values
+        base[f"{col}_count"] = ~pd.isna(values)
+    cube = base.groupby(cell, sort=True).sum()
+
+    cells = cube.index.to_numpy()
+    cube.insert(0, "region", regions.take(cells // n_months))
+    cube.insert(1, "month_code", cells % n_months + first_month)
+    cube.insert(2, "year", (cube["month_code"] // 12).astype(np.int32))
+    return cube.reset_index(drop=True)
+
+def _month_label(month_code):
+    return [f"{c // 12:04d}-{c % 12 + 1:02d}" for c in month_code]
+
+def rollup_cube(cube, by, measures=None):
+    """
+    Roll the region x month cube up to a coarser level.
+
+    Args:
+        cube: Output of `build_region_month_cube`
+        by: Subset of "region", "year" and "month", e.g. ["region", "year"]
+        measures: Dict of output name -> (column, agg) with agg one of
+            "sum", "mean" or "count"; defaults to the total_volume sum
+
+    Returns:
+        DataFrame with one row per group, months labelled "YYYY-MM"
+    """
+    measures = measures or {"total_volume": ("total_volume", "sum")}
+    keys = ["month_code" if k == "month" else k for k in by]
+    parts = {f"{col}_{stat}" for col, _ in measures.values() for stat in ("sum", "count")}
+    grouped = cube.groupby(keys, observed=True, sort=True)[sorted(parts)].sum()
+    out = pd.DataFrame(index=grouped.index)
+    for name, (col, agg) in measures.items():
+        if agg == "sum":
+            out[name] = grouped[f"{col}_sum"]
+        elif agg == "count":
+            out[name] = grouped[f"{col}_count"]
+        elif agg == "mean":
+            out[name] = grouped[f"{col}_sum"] / grouped[f"{col}_count"]
+        else:
+            raise ValueError(f"Unsupported aggregation: {agg}")
+    out = out.reset_index()
+    if "month_code" in out.columns:
+        out["month_code"] = _month_label(out["month_code"])
+        out = out.rename(columns={"month_code": "month"})
+    return out
+
+def _split_week_rollup(df, period, by, measures):
+    """Calendar-split rollup with the same columns as `rollup_cube`."""
+    columns = sorted({col for col, _ in measures.values()})
+    resampled = resample_weekly(df, period, columns, by)
+    out = resampled[list(by) + [period]].copy()
+    for name, (col, _) in measures.items():
+        out[name] = resampled[col]
+    return out
+
+def get_time_aggregations(df, measures=None, split_weeks=False):
+    """
+    Compute monthly and annual aggregations of total volume.
+
+    All four results are derived from one region x month cube, so extra
+    `measures` (see `rollup_cube`) add columns rather than passes over the
+    raw rows. With the default measures the results have the same shape as
+    before: two Series of overall totals and two per-region frames.
+
+    With `split_weeks` each weekly row is apportioned to months by the days
+    it covers (see `resample_weekly`) instead of being counted whole in the
+    month of its date; only "sum" measures are supported then.
+    """
+    default = measures is None
+    measures = measures or {"total_volume": ("total_volume", "sum")}
+    columns = sorted({col for col, _ in measures.values()})
+    if split_weeks:
+        if any(agg != "sum" for _, agg in measures.values()):
+            raise ValueError("split_weeks only supports sum measures")
+        source = df
+        rollup = lambda data, by: _split_week_rollup(data, by[-1], by[:-1], measures)
+    else:
+        source = build_region_month_cube(df, columns)
+        rollup = lambda data, by: rollup_cube(data, by, measures)
+
+    # Overall totals include rows without a region; per-region ones do not
+    annual_total = rollup(source, ["year"]).set_index("year")
+    monthly_total = rollup(source, ["month"]).set_index("month")
+    by_region = source[source["region"].notna()]
+    annual_by_region = rollup(by_region, ["region", "year"])
+    monthly_by_region = rollup(by_region, ["region", "month"])
+
+    if default:
+        annual_total = annual_total["total_volume"]
+        monthly_total = monthly_total["total_volume"]
     return annual_total, monthly_total, annual_by_region, monthly_by_region
 
 def impute_by_region_mean(df, column="averageprice"):
@@ -51,21 +237,152 @@ def impute_by_region_mean(df, column="averageprice"):
     df_copy[column] = df_copy[column].fillna(region_means)
     return df_copy
 
-def map_date_to_category(df):
-    """Map dates to categorical values {Old, New, Recent}."""
-    def map_year_to_category(y):
-        if pd.isna(y):
-            return np.nan
-        if y in (2015, 2016):
-            return "Old"
-        elif y == 2017:
-            return "New"
-        elif y == 2018:
-            return "Recent"
-        else:
-            return np.nan
+def region_mean_stats(df, column="averageprice"):
+    """Per-region sum and non-null count of `column` (mergeable by addition)."""
+    grouped = df.groupby("region")[column]
+    return pd.DataFrame({"sum": grouped.sum(), "count": grouped.count()})
+
+def _merge_region_stats(parts):
+    parts = [p for p in parts if len(p)]
+    if not parts:
+        return pd.DataFrame({"sum": [], "count": []})
+    return pd.concat(parts).groupby(level=0).sum()
+
+def _byte_ranges(file_path, n):
+    """Split the data part of a CSV into n byte ranges, after the header line."""
+    with open(file_path, "rb") as f:
+        header = f.readline()
+        start, size = f.tell(), os.path.getsize(file_path)
+    bounds = np.linspace(start, size, n + 1).astype(np.int64)
+    return header, list(zip(bounds[:-1], bounds[1:]))
+
+def _iter_range_chunks(file_path, header, start, end, block_bytes):
+    """Yield DataFrames for the lines that start inside [start, end)."""
+    names = pd.read_csv(io.BytesIO(header), nrows=0).columns
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        if start > 0:
+            # Back up one byte so a range starting exactly on a line is kept
+            f.seek(start - 1)
+            f.readline()
+        while f.tell() < end:
+            block = f.read(block_bytes)
+            if not block:
+                break
+            block += f.readline()  # finish the last line
+            if f.tell() > end:
+                # Drop lines that start beyond this range
+                cut = end - (f.tell() - len(block))
+                nl = block.find(b"\n", max(cut - 1, 0))
+                block = block[:nl + 1] if nl >= 0 else block
+            yield pd.read_csv(io.BytesIO(block), header=None, names=names)
+            if f.tell() >= end:
+                break
+
+def _region_stats_for_range(file_path, header, start, end, column, block_bytes):
+    parts = [region_mean_stats(preprocess_avocado_frame(chunk), column)
+             for chunk in _iter_range_chunks(file_path, header, start, end, block_bytes)]
+    return _merge_region_stats(parts)
+
+def fit_region_means_chunked(file_path, column="averageprice", chunksize=100_000, n_jobs=1,
+                             block_bytes=16 << 20):
+    """
+    First pass of out-of-core imputation: per-region sums and counts.
 
+    With n_jobs == 1 the CSV is read in chunks of `chunksize` rows. With more
+    jobs the file is split into byte ranges that worker processes parse
+    independently in blocks of about `block_bytes`; their partial sums are
+    added up at the end. Memory is bounded by the chunk/block size either way.
+
+    Returns:
+        DataFrame indexed by region with "sum" and "count" columns
+    """
+    if n_jobs <= 1:
+        parts = [region_mean_stats(preprocess_avocado_frame(chunk), column)
+                 for chunk in pd.read_csv(file_path, chunksize=chunksize)]
+        return _merge_region_stats(parts)
+
+    header, ranges = _byte_ranges(file_path, n_jobs)
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        parts = pool.map(_region_stats_for_range, *zip(*[
+            (file_path, header, start, end, column, block_bytes) for start, end in ranges]))
+        return _merge_region_stats(list(parts))
+
+def save_region_stats(stats, path, column="averageprice"):
+    """Save learned per-region sums and counts as JSON."""
+    state = {"column": column,
+             "sum": {str(k): float(v) for k, v in stats["sum"].items()},
+             "count": {str(k): int(v) for k, v in stats["count"].items()}}
+    with open(path, "w") as f:
+        json.dump(state, f, indent=2)
+
+def load_region_stats(path):
+    """Load per-region sums and counts written by `save_region_stats`."""
+    with open(path) as f:
+        state = json.load(f)
+    return pd.DataFrame({"sum": pd.Series(state["sum"], dtype=float),
+                         "count": pd.Series(state["count"], dtype=np.int64)})
+
+def update_region_stats(stats, df, column="averageprice"):
+    """Fold a new batch into saved region stats without rescanning history."""
+    return _merge_region_stats([stats, region_mean_stats(df, column)])
+
+def impute_csv_by_region_mean(in_path, out_path, stats, column="averageprice", chunksize=100_000):
+    """
+    Second pass: fill missing `column` values chunk by chunk and write to disk.
+
+    Each chunk is preprocessed like `load_and_preprocess_avocado`, filled with
+    the learned region means and appended to `out_path`, so the output is the
+    same as `impute_by_region_mean` without holding the dataset in memory.
+
+    Returns:
+        Number of values that were filled
+    """
+    means = stats["sum"] / stats["count"].replace(0, np.nan)
+    filled = 0
+    with open(out_path, "w", newline="") as out:
+        for i, chunk in enumerate(pd.read_csv(in_path, chunksize=chunksize)):
+            chunk = preprocess_avocado_frame(chunk)
+            missing = chunk[column].isna()
+            chunk.loc[missing, column] = chunk.loc[missing, "region"].map(means)
+            filled += int((missing & chunk[column].notna()).sum())
+            chunk.to_csv(out, header=(i == 0), index=False)
+    return filled
+
+def map_date_to_category(df, hierarchy=None):
+    """
+    Map dates to categorical values {Old, New, Recent}.
+
+    Args:
+        df: Avocado DataFrame with a parsed `date` column
+        hierarchy: Optional concept hierarchy (see `discretize_hierarchy`)
+            whose levels are added as extra categorical columns
+
+    Returns:
+        Copy of `df` with `date_year`, `date_category` and any extra levels
+    """
     df = df.copy()
     df["date_year"] = df["date"].dt.year
-    df["date_category"] = df["date_year"].apply(map_year_to_category)
+    df["date_category"] = discretize(df["date_year"], ranges=DATE_CATEGORY_RANGES)
+    if hierarchy:
+        levels = discretize_hierarchy(df["date"], hierarchy)
+        for name in levels.columns:
+            df[name] = levels[name]
     return df
+
+def normalize_numeric_columns(df, method="minmax", columns=None, dtype=np.float32):
+    """Normalize all numeric avocado columns at once in a single float32 matrix."""
+    columns = [c for c in (columns or AVOCADO_NUMERIC_COLUMNS) if c in df.columns]
+    # One allocation for the whole block, scaled in place
+    matrix = df[columns].to_numpy(dtype=dtype, na_value=np.nan)
+    scale_columns(matrix, method=method, axis=0, out=matrix)
+    return pd.DataFrame(matrix, columns=columns, index=df.index)
+
+def normalize_by_group(df, method="minmax", by=("region", "type"), columns=None, dtype=np.float32):
+    """Normalize numeric avocado columns within each group (region x type by default)."""
+    columns = [c for c in (columns or AVOCADO_NUMERIC_COLUMNS) if c in df.columns]
+    # Integer group codes computed once; -1 marks rows with a missing key
+    codes = df.groupby(list(by), sort=False, observed=True).ngroup().fillna(-1).to_numpy(dtype=np.int64)
+    matrix = df[columns].to_numpy(dtype=dtype, na_value=np.nan)
+    grouped_scaling(matrix, codes, method=method, out=matrix)
+    return pd.DataFrame(matrix, columns=columns, index=df.index)
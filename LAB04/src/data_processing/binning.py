@@ -1,17 +1,23 @@
 import numpy as np
 import pandas as pd
 
-def equal_frequency_bins(values: np.ndarray, nbins: int):
+from .quantile_sketch import KLLSketch
+
+def equal_frequency_bins(values: np.ndarray, nbins: int, return_labels: bool = False):
     """
     Create equal-frequency bins from the data.
     
     Args:
         values: Input array of values
         nbins: Number of bins to create
+        return_labels: If True, return a compact label array instead of
+            a list of index arrays
     
     Returns:
-        bins: List of arrays containing indices for each bin
-        bin_edges: Array of bin boundary values
+        bins: List of arrays containing indices for each bin, or when
+            return_labels is True a tuple (labels, bin_edges) where labels
+            is an int32 array giving the bin of each value and bin_edges
+            holds the nbins + 1 bin boundary values
     """
     n = len(values)
     # Calculate target size for each bin
@@ -20,6 +26,26 @@ def equal_frequency_bins(values: np.ndarray, nbins: int):
     
     # Sort indices based on values
     sorted_indices = np.argsort(values)
+
+    if return_labels:
+        # Bin sizes: the first `remainder` bins get one extra element
+        sizes = np.full(nbins, bin_size, dtype=np.int64)
+        sizes[:remainder] += 1
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+
+        # Scatter bin numbers back to the original positions
+        labels = np.empty(n, dtype=np.int32)
+        labels[sorted_indices] = np.repeat(np.arange(nbins, dtype=np.int32), sizes)
+
+        # Lower edge of every bin plus the overall maximum
+        bin_edges = np.empty(nbins + 1, dtype=float)
+        if n:
+            sorted_values = values[sorted_indices]
+            bin_edges[:-1] = sorted_values[np.minimum(starts, n - 1)]
+            bin_edges[-1] = sorted_values[-1]
+        else:
+            bin_edges[:] = np.nan
+        return labels, bin_edges
     
     bins = []
     current_idx = 0
@@ -34,25 +60,220 @@ def equal_frequency_bins(values: np.ndarray, nbins: int):
     
     return bins
 
+def sketch_equal_frequency_bins(chunks, nbins: int, error: float = 0.01, seed=None):
+    """
+    Approximate equal-frequency bin edges from a stream of chunks.
+    
+    This is the first of two streaming passes. Every chunk is folded into a
+    KLL quantile sketch, so memory does not grow with the length of the
+    stream, and the edges are read off at the nbins + 1 evenly spaced ranks.
+    
+    Args:
+        chunks: Iterable of 1-D arrays of values
+        nbins: Number of bins to create
+        error: Target normalized rank error of the edges (e.g. 0.01 means each
+            edge is within about 1% of the data of its exact position)
+        seed: Seed for the sketch's random compaction
+    
+    Returns:
+        bin_edges: Array of nbins + 1 approximate bin boundary values
+        sketch: The filled KLLSketch, reused by `streaming_smooth`
+    """
+    sketch = KLLSketch.from_error(error, seed=seed)
+    for chunk in chunks:
+        sketch.update(chunk)
+    bin_edges = sketch.quantiles(np.linspace(0, 1, nbins + 1))
+    return bin_edges, sketch
+
+def assign_bins(values: np.ndarray, bin_edges: np.ndarray):
+    """
+    Assign values to bins given their edges.
+    
+    Args:
+        values: Input array of values
+        bin_edges: Array of nbins + 1 bin boundary values
+    
+    Returns:
+        int32 array of bin labels (-1 for NaN values)
+    """
+    nbins = len(bin_edges) - 1
+    labels = np.searchsorted(bin_edges[1:-1], values, side="right").astype(np.int32)
+    np.clip(labels, 0, nbins - 1, out=labels)
+    labels[np.isnan(values)] = -1
+    return labels
+
+def streaming_smooth(chunks, bin_edges: np.ndarray, method: str = "mean", sketch=None):
+    """
+    Assign bins and smooth a stream of chunks (second streaming pass).
+    
+    Boundary smoothing snaps each value to the nearer of its bin's two edges.
+    Mean smoothing uses bin means estimated from the sketch's weighted
+    items, so neither method needs the full column in memory.
+    
+    Args:
+        chunks: Iterable of 1-D arrays of values
+        bin_edges: Edges from `sketch_equal_frequency_bins`
+        method: "mean" or "boundaries"
+        sketch: The sketch built in the first pass (required for "mean")
+    
+    Yields:
+        (labels, smoothed) arrays for each chunk
+    """
+    if method == "mean":
+        if sketch is None:
+            raise ValueError("Mean smoothing needs the sketch from the first pass")
+        items, weights = sketch.weighted_items()
+        item_labels = assign_bins(items, bin_edges)
+        nb = len(bin_edges) - 1
+        with np.errstate(invalid="ignore", divide="ignore"):
+            bin_means = (np.bincount(item_labels, weights=items * weights, minlength=nb) /
+                         np.bincount(item_labels, weights=weights, minlength=nb))
+    elif method != "boundaries":
+        raise ValueError(f"Unsupported streaming smoothing method: {method}")
+
+    for chunk in chunks:
+        values = np.asarray(chunk, dtype=float)
+        labels = assign_bins(values, bin_edges)
+        valid = labels >= 0
+        smoothed = values.copy()
+        lab = labels[valid]
+        if method == "mean":
+            smoothed[valid] = bin_means[lab]
+        else:
+            v = values[valid]
+            lo, hi = bin_edges[lab], bin_edges[lab + 1]
+            smoothed[valid] = np.where(np.abs(v - lo) <= np.abs(v - hi), lo, hi)
+        yield labels, smoothed
+
+def bins_to_labels(bins, n: int):
+    """
+    Convert a list of index arrays into an int32 bin-label array.
+    
+    Args:
+        bins: List of arrays containing indices for each bin
+        n: Number of values covered by the bins
+    
+    Returns:
+        Array of length n giving the bin of each value (-1 if unassigned)
+    """
+    labels = np.full(n, -1, dtype=np.int32)
+    for i, bin_indices in enumerate(bins):
+        labels[bin_indices] = i
+    return labels
+
+def _as_labels(values: np.ndarray, bins):
+    """Accept either a label array or a list of index arrays and return labels."""
+    if isinstance(bins, np.ndarray) and bins.ndim == 1 and bins.dtype.kind in "iu":
+        return bins
+    return bins_to_labels(bins, len(values))
+
+SMOOTHING_STATS = ("mean", "median", "boundaries")
+
+def smooth_all(values: np.ndarray, bins, stats=SMOOTHING_STATS, sorted_output: bool = False):
+    """
+    Smooth every bin by mean, median and/or nearest boundary in one pass.
+    
+    The values are ordered once by (bin, value) so that each bin is a sorted,
+    contiguous segment. Bin sums come from a single segment reduction, the
+    bounds are the first and last element of each segment and the medians
+    are read off by position, so all statistics share the same sort.
+    
+    Args:
+        values: Original array of values
+        bins: Bin-label array or list of arrays containing indices for each bin
+        stats: Which of "mean", "median" and "boundaries" to compute
+        sorted_output: If True, return results in (bin, value) order instead
+            of the original order and include that ordering under "order"
+    
+    Returns:
+        Dict mapping each requested statistic to its smoothed array
+    """
+    unknown = set(stats) - set(SMOOTHING_STATS)
+    if unknown:
+        raise ValueError(f"Unknown smoothing statistics: {sorted(unknown)}")
+
+    labels = _as_labels(values, bins)
+    idx = np.flatnonzero(labels >= 0)
+    # Order by (bin, value) so each bin is a sorted contiguous segment
+    order = idx[np.lexsort((values[idx], labels[idx]))]
+    val_sorted = values[order]
+    lab_sorted = labels[order]
+
+    if order.size:
+        starts = np.flatnonzero(np.r_[True, lab_sorted[1:] != lab_sorted[:-1]])
+    else:
+        starts = np.empty(0, dtype=np.int64)
+    counts = np.diff(np.r_[starts, order.size])
+
+    results = {}
+    for stat, smoothed in smooth_segments(val_sorted, counts, stats).items():
+        if sorted_output:
+            results[stat] = smoothed.astype(values.dtype, copy=False)
+        else:
+            out = values.copy()
+            out[order] = smoothed
+            results[stat] = out
+
+    if sorted_output:
+        results["order"] = order
+    return results
+
+def smooth_segments(sorted_values: np.ndarray, counts, stats=SMOOTHING_STATS):
+    """
+    Smooth bins laid out as consecutive sorted segments (the core of `smooth_all`).
+    
+    Bin sums come from a single segment reduction, the bounds are the first
+    and last element of each segment and the medians are read off by
+    position.
+    
+    Args:
+        sorted_values: Values of bin 0, then bin 1, ..., each bin sorted
+        counts: Number of values in each bin (empty bins are allowed)
+        stats: Which of "mean", "median" and "boundaries" to compute
+    
+    Returns:
+        Dict mapping each requested statistic to its smoothed array, in the
+        order of `sorted_values`
+    """
+    unknown = set(stats) - set(SMOOTHING_STATS)
+    if unknown:
+        raise ValueError(f"Unknown smoothing statistics: {sorted(unknown)}")
+    counts = np.asarray(counts, dtype=np.int64)
+    counts = counts[counts > 0]
+    starts = np.cumsum(counts) - counts
+    ends = starts + counts - 1
+
+    per_bin = {}
+    if "mean" in stats:
+        sums = np.add.reduceat(sorted_values, starts) if counts.size else np.empty(0)
+        per_bin["mean"] = sums / counts
+    if "median" in stats:
+        per_bin["median"] = (sorted_values[starts + (counts - 1) // 2] +
+                             sorted_values[starts + counts // 2]) / 2
+
+    results = {}
+    for stat in stats:
+        if stat == "boundaries":
+            # Nearest of the segment's first (min) and last (max) element
+            lo = np.repeat(sorted_values[starts], counts)
+            hi = np.repeat(sorted_values[ends], counts)
+            results[stat] = np.where(np.abs(sorted_values - lo) <= np.abs(sorted_values - hi), lo, hi)
+        else:
+            results[stat] = np.repeat(per_bin[stat], counts)
+    return results
+
 def smooth_by_mean(values: np.ndarray, bins):
     """
     Replace values in each bin with the bin mean.
     
     Args:
         values: Original array of values
-        bins: List of arrays containing indices for each bin
+        bins: Bin-label array or list of arrays containing indices for each bin
     
     Returns:
         Array with values replaced by bin means
     """
-    out = values.copy()
-    for bin_indices in bins:
-        if len(bin_indices) == 0:
-            continue
-        bin_values = values[bin_indices]
-        mean_val = np.mean(bin_values)
-        out[bin_indices] = mean_val
-    return out
+    return smooth_all(values, bins, stats=("mean",))["mean"]
 
 def smooth_by_median(values: np.ndarray, bins):
     """
@@ -60,19 +281,12 @@ def smooth_by_median(values: np.ndarray, bins):
     
     Args:
         values: Original array of values
-        bins: List of arrays containing indices for each bin
+        bins: Bin-label array or list of arrays containing indices for each bin
     
     Returns:
         Array with values replaced by bin medians
     """
-    out = values.copy()
-    for bin_indices in bins:
-        if len(bin_indices) == 0:
-            continue
-        bin_values = values[bin_indices]
-        median_val = np.median(bin_values)
-        out[bin_indices] = median_val
-    return out
+    return smooth_all(values, bins, stats=("median",))["median"]
 
 def smooth_by_boundaries(values: np.ndarray, bins):
     """
@@ -80,19 +294,9 @@ def smooth_by_boundaries(values: np.ndarray, bins):
     
     Args:
         values: Original array of values
-        bins: List of arrays containing indices for each bin
+        bins: Bin-label array or list of arrays containing indices for each bin
     
     Returns:
         Array with values replaced by nearest bin boundaries
     """
-    out = values.copy()
-    for bin_indices in bins:
-        if len(bin_indices) == 0:
-            continue
-        bin_values = values[bin_indices]
-        lo, hi = np.min(bin_values), np.max(bin_values)
-        # For each value in the bin, replace with the nearest boundary
-        for idx in bin_indices:
-            val = values[idx]
-            out[idx] = lo if abs(val - lo) <= abs(val - hi) else hi
-    return out
+    return smooth_all(values, bins, stats=("boundaries",))["boundaries"]
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+# Year ranges are half-open [low, high): 2015 and 2016 are "Old"
+DATE_CATEGORY_RANGES = {
+    "Old": (2015, 2017),
+    "New": (2017, 2018),
+    "Recent": (2018, 2019),
+}
+
+SEASON_RANGES = {
+    "Winter": [(12, 13), (1, 3)],
+    "Spring": (3, 6),
+    "Summer": (6, 9),
+    "Autumn": (9, 12),
+}
+
+DATE_HIERARCHY = {
+    "date_category": {"source": "year", "ranges": DATE_CATEGORY_RANGES},
+    "date_season": {"source": "month", "ranges": SEASON_RANGES},
+    "date_quarter": {"source": "quarter", "breaks": [1, 2, 3, 4, 5],
+                     "labels": ["Q1", "Q2", "Q3", "Q4"]},
+}
+
+def compile_ranges(ranges):
+    """
+    Turn a label -> range(s) mapping into searchsorted breakpoints.
+
+    Args:
+        ranges: Dict mapping each label to a half-open (low, high) range or a
+            list of such ranges; the same label may cover several ranges
+
+    Returns:
+        Tuple (points, segment_codes, labels): sorted breakpoints, the label
+        code of each segment between consecutive points (-1 for gaps) and
+        the labels in declaration order
+    """
+    labels = list(ranges)
+    intervals = []
+    for code, label in enumerate(labels):
+        spec = ranges[label]
+        for low, high in ([spec] if np.ndim(spec) == 1 else spec):
+            if not low < high:
+                raise ValueError(f"Empty range for {label!r}: [{low}, {high})")
+            intervals.append((low, high, code))
+    intervals.sort()
+    for (_, high, a), (low, _, b) in zip(intervals, intervals[1:]):
+        if low < high:
+            raise ValueError(f"Overlapping ranges for {labels[a]!r} and {labels[b]!r}")
+
+    points = np.unique([v for low, high, _ in intervals for v in (low, high)]).astype(float)
+    segment_codes = np.full(len(points) - 1, -1, dtype=np.int64)
+    for low, high, code in intervals:
+        segment_codes[np.searchsorted(points, low):np.searchsorted(points, high)] = code
+    return points, segment_codes, labels
+
+def discretize(values, ranges=None, breaks=None, labels=None, ordered=True):
+    """
+    Assign concept labels to numeric values with a single searchsorted.
+
+    Either `ranges` (label -> half-open range(s), gaps allowed) or `breaks`
+    plus `labels` (len(breaks) - 1 contiguous bins [breaks[i], breaks[i+1]))
+    must be given. Values outside every range, and NaNs, get a missing label.
+
+    Args:
+        values: Array-like of numbers
+        ranges: Dict of label -> (low, high) or list of (low, high)
+        breaks: Sorted bin edges
+        labels: Labels for the bins defined by `breaks`
+        ordered: Whether the resulting Categorical is ordered
+
+    Returns:
+        pandas Categorical with the labels as categories
+    """
+    if ranges is None:
+        if breaks is None or labels is None or len(labels) != len(breaks) - 1:
+            raise ValueError("Provide ranges, or breaks with len(breaks) - 1 labels")
+        ranges = {label: (breaks[i], breaks[i + 1]) for i, label in enumerate(labels)}
+    points, segment_codes, labels = compile_ranges(ranges)
+
+    values = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    segment = np.searchsorted(points, values, side="right") - 1
+    inside = (segment >= 0) & (segment < len(segment_codes))  # NaN sorts past the last point
+    codes = np.where(inside, segment_codes[np.clip(segment, 0, len(segment_codes) - 1)], -1)
+    return pd.Categorical.from_codes(codes, categories=labels, ordered=ordered)
+
+def _level_source(data, source, cache):
+    """Values a hierarchy level is computed from: a column, a date part, or the data itself."""
+    if source not in cache:
+        if source is None:
+            cache[source] = data
+        elif isinstance(data, pd.DataFrame):
+            cache[source] = data[source]
+        else:
+            # Date parts of a datetime Series, e.g. "year", "month", "quarter"
+            cache[source] = getattr(pd.Series(data).dt, source)
+    return cache[source]
+
+def discretize_hierarchy(data, hierarchy=None):
+    """
+    Emit several concept-hierarchy levels at once.
+
+    Args:
+        data: Datetime Series (levels use date parts such as "year" or
+            "month"), numeric Series (source None) or DataFrame (source is a
+            column name)
+        hierarchy: Dict of level name -> {"source": ..., "ranges": ...} or
+            {"source": ..., "breaks": ..., "labels": ...}; defaults to
+            DATE_HIERARCHY
+
+    Returns:
+        DataFrame with one Categorical column per level, aligned with `data`
+    """
+    hierarchy = DATE_HIERARCHY if hierarchy is None else hierarchy
+    cache = {}
+    index = data.index if hasattr(data, "index") else None
+    levels = {}
+    for name, spec in hierarchy.items():
+        values = _level_source(data, spec.get("source"), cache)
+        levels[name] = discretize(values, ranges=spec.get("ranges"), breaks=spec.get("breaks"),
+                                  labels=spec.get("labels"), ordered=spec.get("ordered", True))
+    return pd.DataFrame(levels, index=index)
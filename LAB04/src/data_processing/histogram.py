@@ -0,0 +1,104 @@
+import numpy as np
+
+class HistogramAccumulator:
+    """
+    Mergeable fixed-edge histogram fed chunk by chunk.
+
+    Counts are accumulated with `np.histogram` per chunk, so a column never
+    has to be in memory as a whole, and accumulators with the same edges
+    (e.g. built in different processes) are merged by adding their counts.
+    Values outside the edges are counted separately as under/overflow.
+
+    Args:
+        edges: Monotonic bin edges (len(edges) - 1 bins)
+    """
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=float)
+        if self.edges.ndim != 1 or len(self.edges) < 2 or np.any(np.diff(self.edges) < 0):
+            raise ValueError("edges must be a monotonic 1-D array with at least 2 values")
+        self.counts = np.zeros(len(self.edges) - 1, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.missing = 0
+
+    @classmethod
+    def from_range(cls, low, high, bins=40):
+        """Equal-width bins over [low, high], like `np.histogram(..., range=(low, high))`."""
+        if low == high:
+            low, high = low - 0.5, high + 0.5  # np.histogram's convention
+        return cls(np.linspace(low, high, bins + 1))
+
+    @classmethod
+    def from_values(cls, values, bins=40):
+        """Histogram of an in-memory array with the same edges as `plt.hist(values, bins)`."""
+        values = np.asarray(values, dtype=float)
+        finite = values[np.isfinite(values)]
+        hist = cls(np.histogram_bin_edges(finite, bins=bins))
+        return hist.update(values)
+
+    @classmethod
+    def from_chunks(cls, make_chunks, bins=40):
+        """
+        Two streaming passes over chunks: one for the range, one for the counts.
+
+        Args:
+            make_chunks: Callable returning a fresh iterator of arrays, e.g.
+                `lambda: iter_avocado_column(path, "total_volume")`
+            bins: Number of equal-width bins
+        """
+        low, high = np.inf, -np.inf
+        for chunk in make_chunks():
+            chunk = np.asarray(chunk, dtype=float)
+            chunk = chunk[np.isfinite(chunk)]
+            if chunk.size:
+                low, high = min(low, chunk.min()), max(high, chunk.max())
+        hist = cls.from_range(low, high, bins) if low <= high else cls.from_range(0.0, 1.0, bins)
+        for chunk in make_chunks():
+            hist.update(chunk)
+        return hist
+
+    def update(self, values):
+        """Add a chunk of values (NaNs are counted as missing)."""
+        values = np.asarray(values, dtype=float).ravel()
+        nan = np.isnan(values)
+        self.missing += int(nan.sum())
+        values = values[~nan]
+        counts, _ = np.histogram(values, bins=self.edges)
+        self.counts += counts
+        self.underflow += int((values < self.edges[0]).sum())
+        self.overflow += int((values > self.edges[-1]).sum())
+        return self
+
+    def merge(self, other: "HistogramAccumulator"):
+        """Add the counts of another accumulator with identical edges."""
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Can only merge histograms with identical edges")
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self.missing += other.missing
+        return self
+
+    def copy(self):
+        hist = HistogramAccumulator(self.edges)
+        return hist.merge(self)
+
+    @property
+    def n(self) -> int:
+        """Number of values inside the edges."""
+        return int(self.counts.sum())
+
+    def to_dict(self):
+        """Serialize to plain Python types."""
+        return {"edges": self.edges.tolist(), "counts": self.counts.tolist(),
+                "underflow": self.underflow, "overflow": self.overflow, "missing": self.missing}
+
+    @classmethod
+    def from_dict(cls, state):
+        """Rebuild an accumulator from the output of `to_dict`."""
+        hist = cls(state["edges"])
+        hist.counts = np.asarray(state["counts"], dtype=np.int64)
+        hist.underflow, hist.overflow = int(state["underflow"]), int(state["overflow"])
+        hist.missing = int(state["missing"])
+        return hist
@@ -1,6 +1,10 @@
 import numpy as np
 import pandas as pd
 import math
+import json
+import warnings
+
+from .quantile_sketch import KLLSketch
 
 def minmax_scaling(data):
     """Apply Min-Max normalization to scale data to [0, 1]."""
@@ -18,3 +22,368 @@ def decimal_scaling(data):
     max_abs = np.max(np.abs(data))
     j = int(math.ceil(math.log10(max_abs + 1e-12)))  # +tiny to avoid log10(0)
     return data / (10 ** j)
+
+def robust_scaling(data):
+    """Apply robust scaling: center on the median and divide by the IQR."""
+    q1, median, q3 = np.nanpercentile(np.asarray(data, dtype=float), [25, 50, 75])
+    return (data - median) / (q3 - q1)
+
+SCALING_METHODS = ("minmax", "zscore", "decimal", "robust")
+
+def scale_columns(data, method="minmax", axis=0, out=None, dtype=None):
+    """
+    Normalize every column (or row) of a 2-D array in a single pass.
+    
+    Args:
+        data: 2-D array-like of numbers; NaNs are ignored by the statistics
+        method: One of "minmax", "zscore", "decimal" or "robust"
+        axis: Axis along which statistics are taken (0 = per column)
+        out: Optional output array; pass `data` itself to scale in place
+        dtype: Compute/result dtype when `out` is not given, e.g. np.float32.
+            Defaults to `data`'s dtype if it is floating, else float64
+    
+    Returns:
+        The scaled array (`out` if it was given)
+    """
+    if method not in SCALING_METHODS:
+        raise ValueError(f"Unknown scaling method: {method}")
+    data = np.asarray(data)
+    if out is None:
+        if dtype is None:
+            dtype = data.dtype if data.dtype.kind == "f" else np.float64
+        out = np.array(data, dtype=dtype, copy=True)
+    elif out is not data:
+        np.copyto(out, data, casting="same_kind")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+        if method == "minmax":
+            lo = np.nanmin(out, axis=axis, keepdims=True)
+            span = np.nanmax(out, axis=axis, keepdims=True) - lo
+            np.subtract(out, lo, out=out)
+            np.divide(out, span, out=out)
+        elif method == "zscore":
+            # Accumulate in float64 even when the array itself is float32
+            mu = np.nanmean(out, axis=axis, keepdims=True, dtype=np.float64)
+            sigma = np.nanstd(out, axis=axis, keepdims=True, dtype=np.float64)  # ddof=0
+            np.subtract(out, mu.astype(out.dtype), out=out)
+            np.divide(out, sigma.astype(out.dtype), out=out)
+        elif method == "robust":
+            q1, median, q3 = np.nanpercentile(out, [25, 50, 75], axis=axis, keepdims=True)
+            np.subtract(out, median.astype(out.dtype), out=out)
+            np.divide(out, (q3 - q1).astype(out.dtype), out=out)
+        else:
+            max_abs = np.nanmax(np.abs(out), axis=axis, keepdims=True)
+            j = np.ceil(np.log10(max_abs + 1e-12))  # +tiny to avoid log10(0)
+            np.divide(out, (10.0 ** j).astype(out.dtype), out=out)
+    return out
+
+def grouped_scaling(data, group_codes, method="minmax", out=None, dtype=None):
+    """
+    Normalize each column within groups given by integer codes.
+    
+    Group statistics are computed once with bincount/ufunc reductions over
+    the codes and broadcast back by indexing, so there is no per-group
+    Python loop.
+    
+    Args:
+        data: 1-D or 2-D array-like (rows x columns); NaNs are ignored
+        group_codes: Integer group code per row (negative codes are left NaN)
+        method: One of "minmax", "zscore" or "decimal"
+        out: Optional output array; pass `data` itself to scale in place
+        dtype: Result dtype when `out` is not given (defaults as in `scale_columns`)
+    
+    Returns:
+        The scaled array (`out` if it was given)
+    """
+    if method not in ("minmax", "zscore", "decimal"):
+        raise ValueError(f"Unsupported grouped scaling method: {method}")
+    data = np.asarray(data)
+    if out is None:
+        if dtype is None:
+            dtype = data.dtype if data.dtype.kind == "f" else np.float64
+        out = np.array(data, dtype=dtype, copy=True)
+    elif out is not data:
+        np.copyto(out, data, casting="same_kind")
+    view = out.reshape(len(out), -1)
+
+    codes = np.asarray(group_codes, dtype=np.int64)
+    valid_rows = codes >= 0
+    ngroups = int(codes.max()) + 1 if valid_rows.any() else 0
+    safe_codes = np.where(valid_rows, codes, 0)
+    if ngroups == 0:
+        # No row belongs to a group: everything is left NaN
+        out[...] = np.nan
+        return out
+
+    for j in range(view.shape[1]):
+        col = view[:, j]
+        ok = valid_rows & ~np.isnan(col)
+        g, v = codes[ok], col[ok].astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if method == "minmax":
+                lo = np.full(ngroups, np.inf)
+                hi = np.full(ngroups, -np.inf)
+                np.minimum.at(lo, g, v)
+                np.maximum.at(hi, g, v)
+                shift, scale = lo, hi - lo
+            elif method == "zscore":
+                n = np.bincount(g, minlength=ngroups)
+                mean = np.bincount(g, weights=v, minlength=ngroups) / n
+                var = np.bincount(g, weights=(v - mean[g]) ** 2, minlength=ngroups) / n  # ddof=0
+                shift, scale = mean, np.sqrt(var)
+            else:
+                max_abs = np.zeros(ngroups)
+                np.maximum.at(max_abs, g, np.abs(v))
+                shift = np.zeros(ngroups)
+                scale = 10.0 ** np.ceil(np.log10(max_abs + 1e-12))  # +tiny to avoid log10(0)
+            col -= shift[safe_codes].astype(out.dtype)
+            col /= scale[safe_codes].astype(out.dtype)
+        col[~valid_rows] = np.nan
+    return out
+
+class _Scaler:
+    """
+    Base class for fitted scalers.
+
+    Statistics are taken along axis 0, so a 1-D array gets scalar
+    parameters and a 2-D array one parameter per column. `partial_fit`
+    folds in one chunk at a time, which lets a scaler be fitted across
+    files that do not fit in memory and reused on later batches.
+    """
+
+    _params = ()
+
+    def __init__(self):
+        for name in self._params:
+            setattr(self, name, None)
+
+    @property
+    def fitted(self):
+        return all(getattr(self, name) is not None for name in self._params)
+
+    def _check_fitted(self):
+        if not self.fitted:
+            raise RuntimeError(f"{type(self).__name__} is not fitted yet")
+
+    def fit(self, data):
+        """Fit the scaler on `data`, discarding any previous state."""
+        self.__init__()
+        return self.partial_fit(data)
+
+    def fit_transform(self, data):
+        return self.fit(data).transform(data)
+
+    def to_dict(self):
+        """Fitted parameters as plain Python types."""
+        self._check_fitted()
+        state = {"scaler": type(self).__name__}
+        for name in self._params:
+            value = getattr(self, name)
+            state[name] = value.tolist() if isinstance(value, np.ndarray) else value
+        return state
+
+    @classmethod
+    def from_dict(cls, state):
+        if state.get("scaler", cls.__name__) != cls.__name__:
+            raise ValueError(f"State belongs to {state['scaler']}, not {cls.__name__}")
+        scaler = cls()
+        for name in cls._params:
+            value = state[name]
+            setattr(scaler, name, np.asarray(value, dtype=float) if isinstance(value, list) else value)
+        return scaler
+
+    def save(self, path):
+        """Save the fitted parameters as JSON."""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        """Load a scaler saved with `save`."""
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+def _as_float_array(data):
+    return np.asarray(data, dtype=float)
+
+class MinMaxScaler(_Scaler):
+    """Min-Max normalization to [0, 1] using running extrema."""
+
+    _params = ("data_min", "data_max")
+
+    def partial_fit(self, data):
+        data = _as_float_array(data)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN chunks
+            chunk_min, chunk_max = np.nanmin(data, axis=0), np.nanmax(data, axis=0)
+        if self.data_min is None:
+            self.data_min, self.data_max = chunk_min, chunk_max
+        else:
+            self.data_min = np.fmin(self.data_min, chunk_min)
+            self.data_max = np.fmax(self.data_max, chunk_max)
+        return self
+
+    def transform(self, data):
+        self._check_fitted()
+        return (_as_float_array(data) - self.data_min) / (self.data_max - self.data_min)
+
+    def inverse_transform(self, data):
+        self._check_fitted()
+        return _as_float_array(data) * (self.data_max - self.data_min) + self.data_min
+
+class ZScoreScaler(_Scaler):
+    """Z-score normalization with merged-moment (Welford/Chan) updates."""
+
+    _params = ("n", "mean", "m2")
+
+    def partial_fit(self, data):
+        data = _as_float_array(data)
+        n_b = np.sum(~np.isnan(data), axis=0).astype(float)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN chunks
+            mean_b = np.nan_to_num(np.nanmean(data, axis=0))
+        m2_b = np.nansum((data - mean_b) ** 2, axis=0)
+        if self.n is None:
+            self.n, self.mean, self.m2 = n_b, mean_b, m2_b
+            return self
+        # Combine the running moments with the chunk's moments
+        n = self.n + n_b
+        with np.errstate(invalid="ignore", divide="ignore"):
+            delta = mean_b - self.mean
+            frac = np.where(n > 0, n_b / n, 0.0)
+            self.mean = self.mean + delta * frac
+            self.m2 = self.m2 + m2_b + delta ** 2 * self.n * frac
+        self.n = n
+        return self
+
+    @property
+    def std(self):
+        """Population standard deviation (ddof=0), as in `zscore_scaling`."""
+        self._check_fitted()
+        return np.sqrt(self.m2 / self.n)
+
+    def transform(self, data):
+        self._check_fitted()
+        return (_as_float_array(data) - self.mean) / self.std
+
+    def inverse_transform(self, data):
+        self._check_fitted()
+        return _as_float_array(data) * self.std + self.mean
+
+class DecimalScaler(_Scaler):
+    """Decimal scaling so that |value| < 1, using the running max |value|."""
+
+    _params = ("max_abs",)
+
+    def partial_fit(self, data):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN chunks
+            chunk_max = np.nanmax(np.abs(_as_float_array(data)), axis=0)
+        self.max_abs = chunk_max if self.max_abs is None else np.fmax(self.max_abs, chunk_max)
+        return self
+
+    @property
+    def scale(self):
+        """The power of ten the data is divided by."""
+        self._check_fitted()
+        j = np.ceil(np.log10(self.max_abs + 1e-12))  # +tiny to avoid log10(0)
+        return 10.0 ** j
+
+    def transform(self, data):
+        self._check_fitted()
+        return _as_float_array(data) / self.scale
+
+    def inverse_transform(self, data):
+        self._check_fitted()
+        return _as_float_array(data) * self.scale
+
+class RobustScaler(_Scaler):
+    """
+    Robust (median/IQR) scaling from streaming quantile sketches.
+
+    Each column is summarized by a KLLSketch, so fitting takes one pass over
+    chunked input in bounded memory even for heavy-tailed columns. Scalers
+    fitted on separate chunks (e.g. in worker processes) combine with
+    `merge`.
+
+    Args:
+        error: Target normalized rank error of the quantile estimates
+        seed: Seed for the sketches' random compaction
+    """
+
+    _params = ("sketches",)
+
+    def __init__(self, error=0.005, seed=None):
+        self.error = error
+        self.seed = seed
+        self.sketches = None
+        self._ndim = None
+
+    def fit(self, data):
+        self.__init__(self.error, self.seed)
+        return self.partial_fit(data)
+
+    def partial_fit(self, data):
+        data = _as_float_array(data)
+        columns = data.reshape(len(data), -1) if data.ndim > 1 else data[:, None]
+        if self.sketches is None:
+            self._ndim = data.ndim
+            self.sketches = [KLLSketch.from_error(self.error, seed=self.seed)
+                             for _ in range(columns.shape[1])]
+        elif columns.shape[1] != len(self.sketches):
+            raise ValueError("Chunk has a different number of columns than the fitted data")
+        for sketch, column in zip(self.sketches, columns.T):
+            sketch.update(column)
+        return self
+
+    def merge(self, other):
+        """Fold the sketches of another RobustScaler into this one."""
+        other._check_fitted()
+        if self.sketches is None:
+            self.sketches = [KLLSketch.from_dict(sk.to_dict(), seed=self.seed) for sk in other.sketches]
+            self._ndim = other._ndim
+            return self
+        if len(other.sketches) != len(self.sketches):
+            raise ValueError("Cannot merge scalers fitted on different numbers of columns")
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        return self
+
+    def _quantiles(self):
+        self._check_fitted()
+        q = np.array([sk.quantiles([0.25, 0.5, 0.75]) for sk in self.sketches]).T
+        return q if self._ndim > 1 else q[:, 0]
+
+    @property
+    def center(self):
+        """Estimated median of each column."""
+        return self._quantiles()[1]
+
+    @property
+    def scale(self):
+        """Estimated interquartile range of each column."""
+        q1, _, q3 = self._quantiles()
+        return q3 - q1
+
+    def transform(self, data):
+        q1, median, q3 = self._quantiles()
+        return (_as_float_array(data) - median) / (q3 - q1)
+
+    def inverse_transform(self, data):
+        q1, median, q3 = self._quantiles()
+        return _as_float_array(data) * (q3 - q1) + median
+
+    def to_dict(self):
+        self._check_fitted()
+        return {"scaler": type(self).__name__, "error": self.error, "ndim": self._ndim,
+                "sketches": [sk.to_dict() for sk in self.sketches]}
+
+    @classmethod
+    def from_dict(cls, state):
+        if state.get("scaler", cls.__name__) != cls.__name__:
+            raise ValueError(f"State belongs to {state['scaler']}, not {cls.__name__}")
+        scaler = cls(error=state["error"])
+        scaler._ndim = state["ndim"]
+        scaler.sketches = [KLLSketch.from_dict(sk) for sk in state["sketches"]]
+        return scaler
@@ -0,0 +1,132 @@
+import math
+
+import numpy as np
+
+class KLLSketch:
+    """
+    Mergeable streaming quantile sketch (Karnin, Lang & Liberty, 2016).
+
+    Values are kept in a stack of compactors. Level h holds items of weight
+    2**h; when a level overflows it is sorted and every other item (random
+    offset) is promoted to the next level. Memory stays O(k log(n / k)) and
+    the normalized rank error is roughly 1.7 / k, independent of how many
+    values are fed in.
+
+    Args:
+        k: Accuracy parameter, the capacity of the top compactor
+        seed: Seed for the random compaction offsets
+    """
+
+    _C = 2.0 / 3.0  # capacity decay between neighbouring levels
+
+    def __init__(self, k: int = 200, seed=None):
+        if k < 8:
+            raise ValueError("k must be at least 8")
+        self.k = int(k)
+        self.n = 0
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_error(cls, error: float, seed=None):
+        """Create a sketch whose normalized rank error is about `error`."""
+        if not 0 < error < 1:
+            raise ValueError("error must be in (0, 1)")
+        return cls(k=max(8, int(math.ceil(1.7 / error))), seed=seed)
+
+    @property
+    def error(self) -> float:
+        """Approximate normalized rank error of this sketch."""
+        return 1.7 / self.k
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * self._C ** depth)))
+
+    def _compress(self):
+        # Lazy compaction: only compact while the sketch as a whole is over
+        # budget, always picking the lowest overfull level
+        while sum(len(buf) for buf in self.levels) > sum(
+                self._capacity(h) for h in range(len(self.levels))):
+            level = next(h for h, buf in enumerate(self.levels)
+                         if len(buf) > self._capacity(h))
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0, dtype=np.float64))
+            buf = np.sort(self.levels[level])
+            # Keep one item behind if the buffer has odd length
+            keep = buf[:1] if len(buf) % 2 else buf[:0]
+            buf = buf[len(keep):]
+            offset = int(self._rng.integers(2))
+            self.levels[level + 1] = np.concatenate((self.levels[level + 1], buf[offset::2]))
+            self.levels[level] = keep
+
+    def update(self, values):
+        """Add a chunk of values (NaNs are ignored)."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.n += values.size
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self._compress()
+        return self
+
+    def merge(self, other: "KLLSketch"):
+        """Merge another sketch into this one, level by level."""
+        if other.k != self.k:
+            raise ValueError("Can only merge sketches with the same k")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for h, buf in enumerate(other.levels):
+            self.levels[h] = np.concatenate((self.levels[h], buf))
+        self.n += other.n
+        self._compress()
+        return self
+
+    def weighted_items(self):
+        """Return the retained items (sorted) and their weights."""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(buf), 2.0 ** h) for h, buf in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], weights[order]
+
+    def quantiles(self, qs):
+        """
+        Estimate quantiles of everything seen so far.
+
+        Args:
+            qs: Scalar or array of probabilities in [0, 1]
+
+        Returns:
+            Array of estimated quantile values (NaN if the sketch is empty)
+        """
+        qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+        if self.n == 0:
+            return np.full(qs.shape, np.nan)
+        items, weights = self.weighted_items()
+        cum = np.cumsum(weights)
+        pos = np.searchsorted(cum, qs * cum[-1], side="left")
+        return items[np.clip(pos, 0, len(items) - 1)]
+
+    def rank(self, x):
+        """Estimate the fraction of values <= x."""
+        if self.n == 0:
+            return np.full(np.shape(x), np.nan)
+        items, weights = self.weighted_items()
+        cum = np.concatenate(([0.0], np.cumsum(weights)))
+        return cum[np.searchsorted(items, x, side="right")] / cum[-1]
+
+    def to_dict(self):
+        """Serialize the sketch to plain Python types."""
+        return {"k": self.k, "n": self.n, "levels": [buf.tolist() for buf in self.levels]}
+
+    @classmethod
+    def from_dict(cls, state, seed=None):
+        """Rebuild a sketch from the output of `to_dict`."""
+        sketch = cls(k=state["k"], seed=seed)
+        sketch.n = int(state["n"])
+        sketch.levels = [np.asarray(buf, dtype=np.float64) for buf in state["levels"]]
+        return sketch
+
+    def __len__(self):
+        return self.n
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+
+PERIODS = ("month", "quarter", "year")
+
+# numpy month units count from 1970-01; the cube uses year * 12 + month - 1
+_EPOCH_MONTH = 1970 * 12
+
+def split_weeks_by_month(dates, days=7, anchor="start"):
+    """
+    Split weekly observations across the calendar months their days fall in.
+
+    A week covers `days` consecutive days, so it touches at most two months
+    and every row yields one or two (row, month, weight) pieces whose
+    weights sum to 1.
+
+    Args:
+        dates: Datetime-like array of the observation dates (NaT rows are dropped)
+        days: Number of days each observation covers (1..28)
+        anchor: "start" if the date is the first day of the week, "end" if it
+            is the last
+
+    Returns:
+        Tuple (rows, month_codes, weights) of equally long arrays, month
+        codes being year * 12 + month - 1
+    """
+    if not 1 <= days <= 28:
+        raise ValueError("days must be between 1 and 28")
+    if anchor not in ("start", "end"):
+        raise ValueError(f"Unknown anchor: {anchor}")
+    d = pd.to_datetime(pd.Series(dates)).to_numpy().astype("datetime64[D]")
+    rows = np.flatnonzero(~np.isnat(d))
+    start = d[rows] if anchor == "start" else d[rows] - (days - 1)
+
+    month = start.astype("datetime64[M]")
+    next_month = (month + 1).astype("datetime64[D]")
+    # Days of the week that fall in the starting month; the rest spill over
+    first = np.minimum(days, (next_month - start).astype(np.int64))
+    spill = first < days
+    month_code = month.astype(np.int64) + _EPOCH_MONTH
+
+    return (np.concatenate((rows, rows[spill])),
+            np.concatenate((month_code, month_code[spill] + 1)),
+            np.concatenate((first, days - first[spill])) / days)
+
+def _period_codes(month_code, period):
+    if period == "month":
+        return month_code
+    if period == "quarter":
+        return month_code // 12 * 4 + month_code % 12 // 3
+    if period == "year":
+        return month_code // 12
+    raise ValueError(f"Unknown period: {period} (expected one of {PERIODS})")
+
+def _period_labels(codes, period):
+    if period == "month":
+        return [f"{c // 12:04d}-{c % 12 + 1:02d}" for c in codes]
+    if period == "quarter":
+        return [f"{c // 4:04d}-Q{c % 4 + 1}" for c in codes]
+    return codes
+
+def resample_weekly(df, period="month", columns=("total_volume",), by=(), days=7, anchor="start"):
+    """
+    Calendar-correct resampling of weekly rows to month, quarter or year.
+
+    Each weekly value is apportioned to months by the number of its days
+    falling in each month, then the pieces are summed per group and period.
+    All groups are handled together: group keys and periods are combined
+    into one integer key and summed with `np.bincount`.
+
+    Args:
+        df: DataFrame with a `date` column, the value columns and `by` columns
+        period: "month", "quarter" or "year"
+        columns: Additive value columns to apportion (NaNs count as 0)
+        by: Grouping columns, e.g. ("region",); rows with a missing key
+            form their own group
+        days: Number of days each row covers
+        anchor: Whether `date` is the first ("start") or last ("end") day
+
+    Returns:
+        DataFrame with the `by` columns, a `period` column (labelled
+        "YYYY-MM", "YYYY-Qn" or the year) and one column per value column
+    """
+    by = list(by)
+    rows, month_code, weights = split_weeks_by_month(df["date"], days, anchor)
+    period_code = _period_codes(month_code, period)
+
+    # One int64 key per (group..., period) cell
+    keys, uniques = [], []
+    for col in by:
+        codes, values = pd.factorize(df[col].to_numpy()[rows], sort=True, use_na_sentinel=False)
+        keys.append(codes)
+        uniques.append(values)
+    first_period = period_code.min() if len(period_code) else 0
+    keys.append(period_code - first_period)
+    shape = tuple(len(u) for u in uniques) + (int(keys[-1].max()) + 1 if len(rows) else 1,)
+    cell = np.ravel_multi_index(keys, shape)
+    cells, inverse = np.unique(cell, return_inverse=True)
+
+    parts = np.unravel_index(cells, shape)
+    out = pd.DataFrame({col: uniques[i].take(parts[i]) for i, col in enumerate(by)})
+    out[period] = _period_labels(parts[-1] + first_period, period)
+    for col in columns:
+        values = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)[rows]
+        out[col] = np.bincount(inverse, weights=np.nan_to_num(values) * weights,
+                               minlength=len(cells))
+    return out
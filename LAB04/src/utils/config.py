@@ -15,6 +15,12 @@ Q2_OUT_TABLES = os.path.join(OUT_BASE, "q2", "tables")
 Q2_OUT_PLOTS = os.path.join(OUT_BASE, "q2", "plots")
 Q2_IN_CSV = os.path.join(Q2_DATA_DIR, "avocado.csv")
 
+# Columnar cache of parsed input files
+CACHE_DIR = os.path.join(PROJECT_ROOT, ".cache")
+
+# Stage timing / memory reports (written when STAGE_PROFILE=1)
+PROFILE_DIR = os.path.join(OUT_BASE, "profiles")
+
 # Plot styling
 COLORS = {
     "base": "#a6cee3",   # light blue
@@ -25,7 +31,17 @@ COLORS = {
 
 GRID_KW = dict(alpha=0.3, linestyle="--", linewidth=0.7)
 
-# Create directories
-for dir_path in [Q1_DATA_DIR, Q1_OUT_TABLES, Q1_OUT_PLOTS,
-                 Q2_DATA_DIR, Q2_OUT_TABLES, Q2_OUT_PLOTS]:
-    os.makedirs(dir_path, exist_ok=True)
+# Directories already created by ensure_dir in this process
+_CREATED_DIRS = set()
+
+def ensure_dir(path):
+    """
+    Create `path` (and its parents) on first use and return it.
+
+    Importing this module has no side effects; output directories are
+    created by the code that writes into them.
+    """
+    if path not in _CREATED_DIRS:
+        os.makedirs(path, exist_ok=True)
+        _CREATED_DIRS.add(path)
+    return path
@@ -0,0 +1,182 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from labtools import instrumentation
+from labtools.digest import code_digest, value_digest
+
+from .config import CACHE_DIR, PROJECT_ROOT
+
+# Values shared with forked workers; set right before each pool is created
+_SHARED = {}
+# Set in pool worker processes while they run a stage
+_IN_WORKER = False
+
+def in_worker():
+    """True inside a `Pipeline` pool worker, where stages should not start pools of their own."""
+    return _IN_WORKER
+
+def _call(func, *args):
+    """Worker entry point: run a stage and ship its instrumentation records back."""
+    global _IN_WORKER
+    _IN_WORKER = True
+    instrumentation.drain()  # records inherited from the parent on fork
+    return func(*args), instrumentation.drain()
+
+def _call_shared(name):
+    """Run a stage on the values inherited from the parent (fork workers)."""
+    stage = _SHARED["stages"][name]
+    return _call(stage.func, *[_SHARED["values"][key] for key in stage.inputs])
+
+class Stage:
+    """
+    One step of a `Pipeline`.
+
+    Args:
+        func: Function called with the input values, in order
+        inputs: Names of the values passed to `func`
+        provides: Name under which the return value is made available to
+            later stages (None if the result is not needed)
+        outputs: Files the stage writes; the stage is rerun if any is missing
+    """
+
+    def __init__(self, func, inputs=("df",), provides=None, outputs=()):
+        self.func = func
+        self.name = func.__name__
+        self.inputs = tuple(inputs)
+        self.provides = provides
+        self.outputs = tuple(outputs)
+
+class Pipeline:
+    """
+    Small task-graph executor for analysis stages.
+
+    Stages declare the named values they consume and the value they
+    provide. `run` executes the graph in waves: every stage whose inputs
+    are available runs in the same wave, in a process pool. Workers are
+    forked after the inputs are in place, so large frames are shared
+    copy-on-write rather than pickled to each worker. Stages can check
+    `in_worker()` so they do not start nested pools of their own.
+
+    A stage is skipped when its inputs (by content), its code and its
+    output files are unchanged since the last run; its cached return
+    value is reused instead.
+
+    Args:
+        name: Pipeline name, used for the state file under `cache_dir`
+        cache_dir: Directory for the run state and cached stage results
+    """
+
+    def __init__(self, name, cache_dir=None):
+        self.name = name
+        self.stages = {}
+        self.cache_dir = os.path.join(cache_dir or CACHE_DIR, "pipeline", name)
+
+    def add(self, func, inputs=("df",), provides=None, outputs=()):
+        """Register a stage; returns the pipeline for chaining."""
+        stage = Stage(func, inputs, provides, outputs)
+        self.stages[stage.name] = stage
+        return self
+
+    def _state_path(self):
+        return os.path.join(self.cache_dir, "state.json")
+
+    def _load_state(self):
+        try:
+            with open(self._state_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _stage_key(self, stage, values, digests):
+        for key in stage.inputs:
+            if key not in digests:
+                digests[key] = value_digest(values[key])
+        src = json.dumps([stage.name, code_digest(stage.func, (PROJECT_ROOT,)),
+                          [digests[key] for key in stage.inputs]])
+        return hashlib.sha256(src.encode()).hexdigest()
+
+    def _waves(self, available):
+        """Group stages into waves whose inputs are produced by earlier waves."""
+        pending = list(self.stages.values())
+        available = set(available)
+        waves = []
+        while pending:
+            ready = [s for s in pending if set(s.inputs) <= available]
+            if not ready:
+                missing = {k for s in pending for k in s.inputs} - available
+                raise ValueError(f"Unsatisfiable stage inputs: {sorted(missing)}")
+            waves.append(ready)
+            available |= {s.provides for s in ready if s.provides}
+            pending = [s for s in pending if s not in ready]
+        return waves
+
+    def run(self, max_workers=None, force=False, **values):
+        """
+        Execute all stages.
+
+        Args:
+            max_workers: Process pool size (1 runs everything in-process)
+            force: Rerun every stage even if it is up to date
+            **values: Initial named values, e.g. df=frame
+
+        Returns:
+            Tuple (values, skipped): dict of all named values, including
+            those provided by stages, and the names of the stages served
+            from the cache
+        """
+        values = dict(values)
+        state = self._load_state()
+        digests = {}
+        skipped = []
+        os.makedirs(self.cache_dir, exist_ok=True)
+        use_fork = "fork" in multiprocessing.get_all_start_methods()
+
+        for wave in self._waves(values):
+            to_run = []
+            for stage in wave:
+                key = self._stage_key(stage, values, digests)
+                result_path = os.path.join(self.cache_dir, f"{stage.name}.pkl")
+                fresh = (not force and state.get(stage.name) == key
+                         and all(os.path.exists(p) for p in stage.outputs)
+                         and (not stage.provides or os.path.exists(result_path)))
+                if fresh:
+                    skipped.append(stage.name)
+                    if stage.provides:
+                        with open(result_path, "rb") as f:
+                            values[stage.provides] = pickle.load(f)
+                else:
+                    to_run.append((stage, key, result_path))
+
+            results = {}
+            if len(to_run) > 1 and max_workers != 1:
+                _SHARED.update(stages=self.stages, values=values)
+                context = multiprocessing.get_context("fork" if use_fork else None)
+                with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+                    futures = {
+                        stage.name: (pool.submit(_call_shared, stage.name) if use_fork else
+                                     pool.submit(_call, stage.func, *[values[k] for k in stage.inputs]))
+                        for stage, _, _ in to_run
+                    }
+                    for name, future in futures.items():
+                        results[name], stages = future.result()
+                        instrumentation.extend(stages)
+                _SHARED.clear()
+            else:
+                for stage, _, _ in to_run:
+                    results[stage.name] = stage.func(*[values[k] for k in stage.inputs])
+
+            for stage, key, result_path in to_run:
+                if stage.provides:
+                    values[stage.provides] = results[stage.name]
+                    with open(result_path, "wb") as f:
+                        pickle.dump(results[stage.name], f, protocol=pickle.HIGHEST_PROTOCOL)
+                state[stage.name] = key
+            # Persist after every wave so an interrupted run keeps finished stages
+            with open(self._state_path(), "w") as f:
+                json.dump(state, f, indent=2)
+
+        return values, skipped
@@ -0,0 +1,11 @@
+import os
+
+from labtools import render_cache
+
+from .config import CACHE_DIR, PROJECT_ROOT
+
+RENDER_CACHE_DIR = os.path.join(CACHE_DIR, "render")
+
+# Render records live under .cache/render; render keys cover every LAB04
+# module the plotting functions import (src.utils.config, ...)
+cached_render = render_cache.cached_render(RENDER_CACHE_DIR, roots=(PROJECT_ROOT,))
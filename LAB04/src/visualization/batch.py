@@ -0,0 +1,61 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from ..utils.pipeline import in_worker
+from . import plotting
+
+# Chart kinds accepted in specs, mapped to the plotting function drawing them
+CHARTS = {
+    "bar": plotting.save_bar,
+    "line": plotting.save_line,
+    "hist": plotting.save_hist,
+    "hist_counts": plotting.save_hist_counts,
+    "smoothing": plotting.save_smoothing_plot,
+}
+
+def chart(kind, *args, **kwargs):
+    """
+    Build a chart spec: the plotting function's name and its arguments.
+
+    Example:
+        chart("bar", counts, "Title", "X", "Count", "out.png")
+    """
+    if kind not in CHARTS:
+        raise ValueError(f"Unknown chart kind: {kind} (expected one of {list(CHARTS)})")
+    return kind, args, kwargs
+
+def render_chart(spec):
+    """Render one chart spec in the current process."""
+    kind, args, kwargs = spec
+    CHARTS[kind](*args, **kwargs)
+    return spec
+
+def render_batch(specs, max_workers=None):
+    """
+    Render chart specs in a process pool.
+
+    The plotting functions draw on their own Figure / Agg canvas and share
+    no pyplot state, so the charts render independently on all cores.
+    Inside a `Pipeline` worker the cores are already busy with the other
+    stages, so the charts are rendered in-process there by default.
+
+    Args:
+        specs: Iterable of `chart(...)` specs
+        max_workers: Pool size (default: one per CPU, or 1 inside a pipeline
+            worker); 1 renders in-process
+    """
+    specs = list(specs)
+    if max_workers is None and in_worker():
+        max_workers = 1
+    max_workers = min(max_workers or os.cpu_count() or 1, len(specs))
+    if max_workers <= 1:
+        for spec in specs:
+            render_chart(spec)
+        return
+    context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods()
+                                          else None)
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+        # Surface the first rendering error, if any
+        for _ in pool.map(render_chart, specs):
+            pass
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+DOWNSAMPLING_METHODS = ("m4", "lttb")
+
+def _as_float(x):
+    """Numeric view of x values (datetimes become int64 nanoseconds)."""
+    x = np.asarray(x)
+    if x.dtype.kind == "M":
+        return x.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return x.astype(float)
+
+def m4_indices(x, y, n_buckets):
+    """
+    Indices of the first, last, minimum and maximum point of every pixel column.
+
+    Drawing only these points as a line gives the same pixels as drawing all
+    of them (M4 aggregation), so at most 4 * n_buckets points are kept.
+    Columns are equal-width ranges of x, which must be sorted.
+
+    Args:
+        x: Sorted x values (numbers or datetimes)
+        y: y values (NaNs are skipped for min/max)
+        n_buckets: Number of pixel columns, normally the plot width in pixels
+
+    Returns:
+        Sorted array of selected indices
+    """
+    xf, y = _as_float(x), np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= 4 * n_buckets:
+        return np.arange(n)
+    span = xf[-1] - xf[0]
+    if not np.isfinite(span) or span <= 0:
+        bucket = np.arange(n) * n_buckets // n  # fall back to equal-count columns
+    else:
+        bucket = np.minimum(((xf - xf[0]) / span * n_buckets).astype(np.int64), n_buckets - 1)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    counts = ends - starts + 1
+
+    selected = [starts, ends]
+    with np.errstate(invalid="ignore"):
+        for reduce in (np.fmin, np.fmax):
+            extreme = np.repeat(reduce.reduceat(y, starts), counts)
+            hits = np.flatnonzero(y == extreme)
+            # First hit in each column
+            segment = np.searchsorted(starts, hits, side="right") - 1
+            _, first = np.unique(segment, return_index=True)
+            selected.append(hits[first])
+    return np.unique(np.concatenate(selected))
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last point and, from each of n_out - 2 equal-count
+    buckets, the point forming the largest triangle with the point kept in
+    the previous bucket and the mean of the next bucket.
+
+    Args:
+        x: x values (numbers or datetimes)
+        y: y values
+        n_out: Number of points to keep
+
+    Returns:
+        Sorted array of selected indices
+    """
+    xf, y = _as_float(x), np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Mean point of every bucket, used as the third triangle corner
+    sums_x = np.add.reduceat(xf[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(np.nan_to_num(y[1:n - 1]), edges[:-1] - 1)
+    sizes = np.diff(edges)
+    mean_x = np.r_[sums_x / sizes, xf[-1]]
+    mean_y = np.r_[sums_y / sizes, y[-1]]
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax_, ay_ = xf[a], y[a]
+        area = np.abs((ax_ - mean_x[i + 1]) * (y[lo:hi] - ay_)
+                      - (ax_ - xf[lo:hi]) * (mean_y[i + 1] - ay_))
+        a = lo + int(np.nanargmax(area)) if np.isfinite(area).any() else lo
+        selected[i + 1] = a
+    return selected
+
+def downsample(x, y, n_buckets, method="m4"):
+    """
+    Reduce a line to about what a plot `n_buckets` pixels wide can show.
+
+    Args:
+        x: x values (array, Index or Series)
+        y: y values
+        n_buckets: Plot width in pixels
+        method: "m4" (pixel-exact min/max/first/last per column) or "lttb"
+
+    Returns:
+        Tuple (x, y) of the selected points, same types as the input arrays
+    """
+    if method == "m4":
+        idx = m4_indices(x, y, n_buckets)
+    elif method == "lttb":
+        idx = lttb_indices(x, y, 2 * n_buckets)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method} (expected one of {DOWNSAMPLING_METHODS})")
+    take = lambda v: v[idx] if isinstance(v, (pd.Index, np.ndarray)) else np.asarray(v)[idx]
+    return take(x), take(y)
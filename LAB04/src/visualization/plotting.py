@@ -1,54 +1,108 @@
-import matplotlib.pyplot as plt
+import os
+
 import numpy as np
 import pandas as pd
-from ..utils.config import COLORS, GRID_KW
+from ..utils.config import COLORS, GRID_KW, ensure_dir
+from ..utils.render_cache import cached_render
+from .downsampling import downsample
+from ..data_processing.histogram import HistogramAccumulator
+
+def new_figure(figsize, dpi=140):
+    """
+    A Figure with its own Agg canvas and one Axes, outside pyplot.
+
+    Nothing is registered in pyplot's global figure list, so figures can be
+    built concurrently and need no `plt.close`; they are freed like any
+    other object.
+    """
+    # matplotlib is imported on first use: runs whose plots are all
+    # up to date in the render cache never load it
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
 
+def save_figure(fig, outpath, **kwargs):
+    """Lay out and write a figure created by `new_figure`."""
+    ensure_dir(os.path.dirname(os.path.abspath(outpath)))
+    fig.tight_layout()
+    fig.savefig(outpath, **kwargs)
+
+@cached_render
 def save_bar(values, title, xlabel, ylabel, outpath, rotate=0):
-    plt.figure(figsize=(10, 5.5), dpi=140)
-    ax = plt.gca()
+    fig, ax = new_figure((10, 5.5))
     values.plot(kind="bar", ax=ax, color=COLORS["base"], edgecolor="#333333")
-    plt.title(title, pad=12)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
+    ax.set_title(title, pad=12)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
     if rotate:
-        plt.xticks(rotation=rotate, ha="right")
-    plt.grid(**GRID_KW, axis="y")
-    plt.tight_layout()
-    plt.savefig(outpath)
-    plt.close()
-
-def save_line(df_xy, title, xlabel, ylabel, outpath):
-    plt.figure(figsize=(10.5, 5.5), dpi=140)
-    plt.plot(df_xy.index, df_xy.values, marker="o", linewidth=1.8, markersize=3.5, color=COLORS["alt1"])
-    plt.title(title, pad=12)
-    plt.xlabel(xlabel)
-    plt.ylabel(ylabel)
-    plt.grid(**GRID_KW)
-    plt.tight_layout()
-    plt.savefig(outpath)
-    plt.close()
+        for label in ax.get_xticklabels():
+            label.set(rotation=rotate, ha="right")
+    ax.grid(**GRID_KW, axis="y")
+    save_figure(fig, outpath)
+
+def _plot_line(ax, x, y, method="m4", **kwargs):
+    """
+    ax.plot that draws at most a few points per pixel column.
+
+    Above 4 points per column of the figure the line is downsampled (see
+    `downsample`), so render time depends on the figure width rather than
+    on the number of points. `method=None` draws every point.
+    """
+    fig = ax.figure
+    width_px = int(fig.get_figwidth() * fig.dpi)
+    if method is not None and len(y) > 4 * width_px:
+        x, y = downsample(x, y, width_px, method)
+    return ax.plot(x, y, **kwargs)
+
+@cached_render
+def save_line(df_xy, title, xlabel, ylabel, outpath, downsample_method="m4"):
+    fig, ax = new_figure((10.5, 5.5))
+    _plot_line(ax, df_xy.index, df_xy.values, downsample_method,
+               marker="o", linewidth=1.8, markersize=3.5, color=COLORS["alt1"])
+    ax.set_title(title, pad=12)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.grid(**GRID_KW)
+    save_figure(fig, outpath)
+
+def plot_hist_counts(ax, hist, **kwargs):
+    """Draw a `HistogramAccumulator` on `ax` like `ax.hist` would."""
+    kwargs.setdefault("edgecolor", "#333333")
+    # One weighted sample per bin: same bars as ax.hist on the raw values
+    return ax.hist(hist.edges[:-1], bins=hist.edges, weights=hist.counts, **kwargs)
 
 def save_hist(series, title, outpath, bins=40, color=COLORS["alt2"]):
-    plt.figure(figsize=(9.5, 5.3), dpi=140)
-    plt.hist(series.dropna().values, bins=bins, edgecolor="#333333", alpha=0.9, color=color)
-    plt.title(title, pad=12)
-    plt.xlabel(series.name)
-    plt.ylabel("Frequency")
-    plt.grid(**GRID_KW)
-    plt.tight_layout()
-    plt.savefig(outpath)
-    plt.close()
-
-def save_smoothing_plot(original, smoothed, label, color, outpath):
+    hist = HistogramAccumulator.from_values(series.dropna().values, bins)
+    save_hist_counts(hist, title, series.name, outpath, color=color)
+
+@cached_render
+def save_hist_counts(hist, title, xlabel, outpath, color=COLORS["alt2"]):
+    """Save a histogram drawn from pre-binned counts (see `HistogramAccumulator`)."""
+    fig, ax = new_figure((9.5, 5.3))
+    plot_hist_counts(ax, hist, alpha=0.9, color=color)
+    ax.set_title(title, pad=12)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel("Frequency")
+    ax.grid(**GRID_KW)
+    save_figure(fig, outpath)
+
+@cached_render
+def save_smoothing_plot(original, smoothed, label, color, outpath, bin_labels=None,
+                        downsample_method="m4"):
+    # With a bin-label array the inputs may be in row order; draw them in bin order
+    if bin_labels is not None:
+        order = np.lexsort((original, bin_labels))
+        original, smoothed = np.asarray(original)[order], np.asarray(smoothed)[order]
     x = np.arange(len(original))
-    plt.figure(figsize=(11, 5.8), dpi=140)
-    plt.plot(x, original, linewidth=1.2, alpha=0.7, label="Original (sorted)", color=COLORS["base"])
-    plt.plot(x, smoothed, linewidth=1.8, alpha=0.95, label=label, color=color)
-    plt.title(f"Total Volume – {label}", pad=12)
-    plt.xlabel("Index (after sorting by Total Volume)")
-    plt.ylabel("Total Volume")
-    plt.grid(**GRID_KW)
-    plt.legend(frameon=True)
-    plt.tight_layout()
-    plt.savefig(outpath)
-    plt.close()
+    fig, ax = new_figure((11, 5.8))
+    _plot_line(ax, x, original, downsample_method,
+               linewidth=1.2, alpha=0.7, label="Original (sorted)", color=COLORS["base"])
+    _plot_line(ax, x, smoothed, downsample_method, linewidth=1.8, alpha=0.95, label=label, color=color)
+    ax.set_title(f"Total Volume – {label}", pad=12)
+    ax.set_xlabel("Index (after sorting by Total Volume)")
+    ax.set_ylabel("Total Volume")
+    ax.grid(**GRID_KW)
+    ax.legend(frameon=True)
+    save_figure(fig, outpath)
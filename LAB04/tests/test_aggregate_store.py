@@ -0,0 +1,76 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the LAB04 directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_processing.aggregate_store import AggregateStore
+
+def avocado_rows(n=2000, seed=0, weeks=30):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2015-01-04", periods=weeks, freq="7D")
+    price = rng.normal(1.4, 0.3, n)
+    price[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame({
+        "date": dates[rng.integers(weeks, size=n)],
+        "region": rng.choice(["Albany", "Boston", "Chicago"], n),
+        "type": rng.choice(["conventional", "organic"], n),
+        "total_volume": rng.lognormal(10, 1, n),
+        "averageprice": price,
+    })
+
+def reference(df, column, start=None, end=None, region=None, type_=None):
+    # The scan the store replaces: filter the raw rows, then aggregate
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df["date"] >= start
+    if end is not None:
+        mask &= df["date"] <= end
+    if region is not None:
+        mask &= df["region"] == region
+    if type_ is not None:
+        mask &= df["type"] == type_
+    return df.loc[mask, column]
+
+QUERIES = [
+    {},
+    {"start": "2015-02-01", "end": "2015-04-30"},
+    {"region": "Boston"},
+    {"type_": "organic", "end": "2015-03-01"},
+    {"start": "2015-03-15", "region": "Chicago", "type_": "conventional"},
+    {"start": "2016-01-01"},
+]
+
+def assert_matches(store, df):
+    for query in QUERIES:
+        volume = reference(df, "total_volume", **query)
+        price = reference(df, "averageprice", **query)
+        np.testing.assert_allclose(store.total("total_volume", **query), volume.sum())
+        assert store.count("averageprice", **query) == price.count()
+        if price.count():
+            np.testing.assert_allclose(store.mean("averageprice", **query), price.mean())
+        else:
+            assert np.isnan(store.mean("averageprice", **query))
+
+def test_queries_match_pandas_filters():
+    df = avocado_rows()
+    assert_matches(AggregateStore.from_frame(df), df)
+
+def test_append_matches_full_build():
+    df = avocado_rows().sort_values("date", kind="stable").reset_index(drop=True)
+    cut = df["date"] >= "2015-04-01"
+    store = AggregateStore.from_frame(df[~cut])
+    store.append(df[cut])
+    # Late rows for weeks already stored, with a new region
+    late = avocado_rows(n=50, seed=1, weeks=10).assign(region="Denver")
+    store.append(late)
+    assert_matches(store, pd.concat([df, late], ignore_index=True))
+
+def test_save_load_round_trip(tmp_path):
+    df = avocado_rows(n=500)
+    path = str(tmp_path / "store.npz")
+    AggregateStore.from_frame(df).save(path)
+    assert_matches(AggregateStore.load(path), df)
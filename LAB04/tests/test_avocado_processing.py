@@ -0,0 +1,38 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the LAB04 directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_processing.avocado_processing import (parse_dates, fit_region_means_chunked,
+                                                   impute_csv_by_region_mean)
+
+def test_parse_dates_all_missing():
+    parsed = parse_dates(pd.Series([np.nan, np.nan], name="date"))
+    assert parsed.dtype.kind == "M"
+    assert parsed.isna().all()
+    assert parsed.name == "date"
+
+def test_parse_dates_partly_missing():
+    parsed = parse_dates(pd.Series(["27-12-2015", np.nan, "not a date", "03-01-2016", "27-12-2015"]))
+    expected = pd.to_datetime(["2015-12-27", None, None, "2016-01-03", "2015-12-27"])
+    assert parsed.isna().tolist() == [False, True, True, False, False]
+    assert (parsed[parsed.notna()] == expected[expected.notna()]).all()
+
+def test_chunked_imputation_with_all_missing_date_chunk(tmp_path):
+    raw = pd.DataFrame({
+        "Date": ["27-12-2015", "20-12-2015", np.nan, np.nan],
+        "AveragePrice": [1.0, np.nan, 3.0, np.nan],
+        "Total Volume": [10.0, 20.0, 30.0, 40.0],
+        "region": ["A", "A", "B", "B"],
+    })
+    in_path, out_path = tmp_path / "in.csv", tmp_path / "out.csv"
+    raw.to_csv(in_path, index=False)
+    # chunksize=2: the second chunk has no valid date at all
+    stats = fit_region_means_chunked(in_path, chunksize=2)
+    assert impute_csv_by_region_mean(in_path, out_path, stats, chunksize=2) == 2
+    out = pd.read_csv(out_path)
+    assert out["averageprice"].tolist() == [1.0, 1.0, 3.0, 3.0]
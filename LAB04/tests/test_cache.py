@@ -0,0 +1,82 @@
+import os
+import sys
+
+import pandas as pd
+
+# Add the LAB04 directory (src) and the repository root (labtools) to Python path
+LAB04_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(LAB04_DIR)
+sys.path.append(os.path.dirname(LAB04_DIR))
+
+from labtools.cache import cached_load, read_frame, write_frame
+from src.data_processing.avocado_processing import load_avocado_typed
+
+CSV = """Date,AveragePrice,Total Volume,type,year,region
+27-12-2015,1.33,64236.62,conventional,2015,Albany
+20-12-2015,,54876.98,organic,,Boston
+13-12-2015,0.93,118220.22,conventional,2015,Albany
+"""
+
+class CountingLoader:
+    """pd.read_csv that counts how often it actually parses the file."""
+
+    def __init__(self, loader=pd.read_csv):
+        self.loader = loader
+        self.calls = 0
+        self.__module__, self.__qualname__ = loader.__module__, loader.__qualname__
+
+    def __call__(self, path, **options):
+        self.calls += 1
+        return self.loader(path, **options)
+
+def write_csv(tmp_path, text=CSV):
+    path = tmp_path / "avocado.csv"
+    path.write_text(text)
+    return str(path)
+
+def test_cached_load_round_trip(tmp_path):
+    path, cache_dir = write_csv(tmp_path), str(tmp_path / "cache")
+    loader = CountingLoader()
+    first = cached_load(loader, path, cache_dir)
+    second = cached_load(loader, path, cache_dir)
+    assert loader.calls == 1
+    pd.testing.assert_frame_equal(first, pd.read_csv(path))
+    pd.testing.assert_frame_equal(second, pd.read_csv(path))
+
+def test_typed_frame_round_trip(tmp_path):
+    path, cache_dir = write_csv(tmp_path), str(tmp_path / "cache")
+    expected = load_avocado_typed(path)
+    # Categoricals, datetimes, float32 and a nullable Int16 column (missing year)
+    assert str(expected["year"].dtype) == "Int16"
+    cached_load(load_avocado_typed, path, cache_dir)
+    pd.testing.assert_frame_equal(cached_load(load_avocado_typed, path, cache_dir), expected)
+
+def test_edited_file_and_options_miss_the_cache(tmp_path):
+    path, cache_dir = write_csv(tmp_path), str(tmp_path / "cache")
+    loader = CountingLoader()
+    cached_load(loader, path, cache_dir)
+    cached_load(loader, path, cache_dir, usecols=["region"])
+    assert loader.calls == 2
+    write_csv(tmp_path, CSV + "06-12-2015,1.08,78992.15,organic,2015,Boston\n")
+    assert len(cached_load(loader, path, cache_dir)) == 4
+    assert loader.calls == 3
+    # Entries of the old file version are gone
+    entries = [name for name in os.listdir(cache_dir) if name.startswith("avocado-")]
+    assert len(entries) == 1
+
+def test_returned_frame_does_not_write_through(tmp_path):
+    directory = str(tmp_path / "frame")
+    write_frame(pd.DataFrame({"x": [1.0, 2.0]}, index=[10, 20]), directory)
+    df = read_frame(directory)
+    df.iloc[0, 0] = 99.0
+    reread = read_frame(directory)
+    assert reread["x"].tolist() == [1.0, 2.0]
+    assert reread.index.tolist() == [10, 20]
+
+def test_unsupported_columns_are_returned_uncached(tmp_path):
+    path, cache_dir = write_csv(tmp_path), str(tmp_path / "cache")
+    loader = CountingLoader(lambda p: pd.DataFrame({"lists": [[1], [2, 3]]}))
+    assert cached_load(loader, path, cache_dir)["lists"].tolist() == [[1], [2, 3]]
+    cached_load(loader, path, cache_dir)
+    assert loader.calls == 2
+    assert not [name for name in os.listdir(cache_dir) if name.startswith("avocado-")]
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the LAB04 directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_processing.discretization import (DATE_CATEGORY_RANGES, compile_ranges, discretize,
+                                               discretize_hierarchy)
+
+def test_breaks_match_pd_cut():
+    values = np.random.default_rng(0).uniform(-1, 11, 1000)
+    values[::37] = np.nan
+    breaks, labels = [0, 2.5, 5, 10], ["low", "mid", "high"]
+    result = discretize(values, breaks=breaks, labels=labels)
+    expected = pd.cut(values, breaks, labels=labels, right=False)
+    assert list(result.categories) == labels and result.ordered
+    assert (pd.Series(result).astype(object).fillna("-").tolist() ==
+            pd.Series(expected).astype(object).fillna("-").tolist())
+
+def test_ranges_with_gaps_match_per_label_masks():
+    values = pd.Series([2014, 2015, 2016, 2017, 2018, 2019, np.nan])
+    result = discretize(values, ranges=DATE_CATEGORY_RANGES)
+    expected = pd.Series("-", index=values.index, dtype=object)
+    for label, (low, high) in DATE_CATEGORY_RANGES.items():
+        expected[(values >= low) & (values < high)] = label
+    assert pd.Series(result).astype(object).fillna("-").tolist() == expected.tolist()
+
+def test_label_covering_several_ranges():
+    ranges = {"Winter": [(12, 13), (1, 3)], "Spring": (3, 6)}
+    result = discretize([1, 2, 3, 5, 6, 12], ranges=ranges)
+    assert pd.Series(result).astype(object).fillna("-").tolist() == ["Winter", "Winter", "Spring",
+                                                                      "Spring", "-", "Winter"]
+
+def test_invalid_ranges():
+    with pytest.raises(ValueError):
+        compile_ranges({"a": (0, 5), "b": (4, 8)})
+    with pytest.raises(ValueError):
+        compile_ranges({"a": (5, 5)})
+    with pytest.raises(ValueError):
+        discretize([1, 2], breaks=[0, 1, 2], labels=["only one"])
+
+def test_hierarchy_matches_date_parts():
+    dates = pd.Series(pd.to_datetime(["2015-01-04", "2016-04-10", "2017-07-16", "2018-12-30", None]))
+    levels = discretize_hierarchy(dates)
+    assert list(levels.columns) == ["date_category", "date_season", "date_quarter"]
+    assert levels["date_category"].astype(object).fillna("-").tolist() == ["Old", "Old", "New",
+                                                                           "Recent", "-"]
+    assert levels["date_season"].astype(object).fillna("-").tolist() == ["Winter", "Spring",
+                                                                         "Summer", "Winter", "-"]
+    expected_quarter = [f"Q{q:.0f}" if q == q else "-" for q in dates.dt.quarter]
+    assert levels["date_quarter"].astype(object).fillna("-").tolist() == expected_quarter
@@ -0,0 +1,70 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the LAB04 directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.visualization.downsampling import downsample, lttb_indices, m4_indices
+
+def random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.arange(n, dtype=float), np.cumsum(rng.normal(size=n))
+
+def m4_reference(x, y, n_buckets):
+    # First, last, min and max row of every equal-width x column, via pandas
+    bucket = np.minimum(((x - x[0]) / (x[-1] - x[0]) * n_buckets).astype(int), n_buckets - 1)
+    groups = pd.Series(y).groupby(bucket)
+    picked = np.concatenate([groups.head(1).index, groups.tail(1).index, groups.idxmin(), groups.idxmax()])
+    return np.unique(picked)
+
+def lttb_reference(x, y, n_out):
+    # Textbook Largest-Triangle-Three-Buckets, one bucket at a time
+    n = len(x)
+    every = (n - 2) / (n_out - 2)
+    selected, a = [0], 0
+    for i in range(n_out - 2):
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        next_lo, next_hi = hi, min(int((i + 2) * every) + 1, n - 1)
+        if i == n_out - 3:
+            avg_x, avg_y = x[n - 1], y[n - 1]
+        else:
+            avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        areas = [abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a])) for j in range(lo, hi)]
+        a = lo + int(np.argmax(areas))
+        selected.append(a)
+    return np.array(selected + [n - 1])
+
+def test_m4_matches_per_column_extremes():
+    x, y = random_walk(10_000)
+    np.testing.assert_array_equal(m4_indices(x, y, 200), m4_reference(x, y, 200))
+
+def test_m4_keeps_short_series():
+    x, y = random_walk(50)
+    np.testing.assert_array_equal(m4_indices(x, y, 20), np.arange(50))
+
+def test_m4_skips_nan_for_extremes():
+    x, y = random_walk(1000, seed=1)
+    y[::3] = np.nan
+    idx = m4_indices(x, y, 50)
+    reference = m4_reference(x, pd.Series(y).to_numpy(), 50)
+    # pandas' idxmin/idxmax skip NaN as well
+    np.testing.assert_array_equal(idx, reference)
+
+def test_lttb_matches_textbook_algorithm():
+    x, y = random_walk(5003, seed=2)
+    np.testing.assert_array_equal(lttb_indices(x, y, 300), lttb_reference(x, y, 300))
+
+def test_downsample_keeps_input_types():
+    dates = pd.date_range("2015-01-04", periods=5000, freq="D")
+    values = pd.Series(np.sin(np.arange(5000) / 50.0))
+    for method in ("m4", "lttb"):
+        xs, ys = downsample(dates, values, 100, method=method)
+        assert isinstance(xs, pd.DatetimeIndex)
+        assert len(xs) == len(ys) <= 4 * 100
+        assert xs[0] == dates[0] and xs[-1] == dates[-1]
+    with pytest.raises(ValueError):
+        downsample(dates, values, 100, method="mean")
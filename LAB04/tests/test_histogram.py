@@ -0,0 +1,62 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the LAB04 directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_processing.histogram import HistogramAccumulator
+
+def test_from_values_matches_numpy_histogram():
+    values = np.random.default_rng(0).lognormal(size=10_000)
+    values[::97] = np.nan
+    hist = HistogramAccumulator.from_values(values, bins=40)
+    counts, edges = np.histogram(values[~np.isnan(values)], bins=40)
+    np.testing.assert_array_equal(hist.edges, edges)
+    np.testing.assert_array_equal(hist.counts, counts)
+    assert hist.missing == np.isnan(values).sum()
+    assert hist.n == np.isfinite(values).sum()
+
+def test_from_chunks_matches_numpy_histogram():
+    values = np.random.default_rng(1).normal(size=25_000)
+    hist = HistogramAccumulator.from_chunks(lambda: iter(np.array_split(values, 7)), bins=30)
+    counts, edges = np.histogram(values, bins=30)
+    np.testing.assert_allclose(hist.edges, edges)
+    np.testing.assert_array_equal(hist.counts, counts)
+
+def test_constant_values_like_numpy():
+    hist = HistogramAccumulator.from_chunks(lambda: iter([np.full(5, 3.0)]), bins=4)
+    counts, edges = np.histogram(np.full(5, 3.0), bins=4)
+    np.testing.assert_allclose(hist.edges, edges)
+    np.testing.assert_array_equal(hist.counts, counts)
+
+def test_out_of_range_values():
+    hist = HistogramAccumulator.from_range(0.0, 10.0, bins=5).update([-1.0, 0.0, 5.0, 10.0, 11.0, np.nan])
+    counts, _ = np.histogram([0.0, 5.0, 10.0], bins=5, range=(0.0, 10.0))
+    np.testing.assert_array_equal(hist.counts, counts)
+    assert (hist.underflow, hist.overflow, hist.missing) == (1, 1, 1)
+
+def test_merge_equals_single_pass():
+    rng = np.random.default_rng(2)
+    a, b = rng.normal(size=1000), rng.normal(size=2000)
+    left = HistogramAccumulator.from_range(-4.0, 4.0, bins=16).update(a)
+    right = HistogramAccumulator.from_range(-4.0, 4.0, bins=16).update(b)
+    whole = HistogramAccumulator.from_range(-4.0, 4.0, bins=16).update(np.concatenate((a, b)))
+    merged = left.copy().merge(right)
+    np.testing.assert_array_equal(merged.counts, whole.counts)
+    assert (merged.underflow, merged.overflow) == (whole.underflow, whole.overflow)
+    # copy() leaves the original untouched
+    assert left.n == HistogramAccumulator.from_range(-4.0, 4.0, bins=16).update(a).n
+
+def test_merge_rejects_other_edges():
+    with pytest.raises(ValueError):
+        HistogramAccumulator.from_range(0, 1, 4).merge(HistogramAccumulator.from_range(0, 2, 4))
+
+def test_dict_round_trip():
+    hist = HistogramAccumulator.from_range(0.0, 1.0, bins=8).update([0.1, 0.5, 2.0, np.nan])
+    restored = HistogramAccumulator.from_dict(hist.to_dict())
+    np.testing.assert_array_equal(restored.edges, hist.edges)
+    np.testing.assert_array_equal(restored.counts, hist.counts)
+    assert (restored.underflow, restored.overflow, restored.missing) == (0, 1, 1)
@@ -0,0 +1,87 @@
+import os
+import sys
+
+import numpy as np
+
+# Add the LAB04 directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_processing.binning import equal_frequency_bins, smooth_all
+from src.data_processing.incremental_binning import IncrementalBinning
+
+STATS = ("mean", "median", "boundaries")
+
+def batch_smoothing(values, nbins):
+    # Reference: the batch binning + smoothing of the values seen so far
+    values = values[~np.isnan(values)]
+    labels, _ = equal_frequency_bins(values, nbins, return_labels=True)
+    return smooth_all(values, labels, STATS, sorted_output=True)
+
+def test_from_values_matches_equal_frequency_bins():
+    values = np.random.default_rng(0).lognormal(size=1003)
+    state = IncrementalBinning.from_values(values, nbins=10)
+    bins = equal_frequency_bins(values, 10)
+    np.testing.assert_array_equal(state.counts, [len(b) for b in bins])
+    np.testing.assert_array_equal(state.sorted_values, np.sort(values))
+    np.testing.assert_allclose(state.sums, [values[b].sum() for b in bins])
+
+def test_append_keeps_bins_sorted_and_balanced():
+    rng = np.random.default_rng(1)
+    values = rng.lognormal(size=2000)
+    state = IncrementalBinning.from_values(values[:1000], nbins=20, tolerance=0.1)
+    for chunk in np.array_split(values[1000:], 10):
+        state.append(chunk)
+    np.testing.assert_array_equal(state.sorted_values, np.sort(values))
+    target = state.n / state.nbins
+    assert np.all(np.abs(state.counts - target) <= 0.1 * target + 1)
+    summary = state.bin_summary()
+    np.testing.assert_allclose(summary["mean"], [b.mean() for b in state.bins])
+    np.testing.assert_allclose(summary["median"], [np.median(b) for b in state.bins])
+
+def test_exact_smoothing_matches_batch_smoothing_after_appends():
+    rng = np.random.default_rng(2)
+    values = rng.normal(size=3000)
+    values[::50] = np.nan
+    state = IncrementalBinning.from_values(values[:500], nbins=25)
+    for chunk in np.array_split(values[500:], 5):
+        state.append(chunk)
+    sorted_values, smoothed = state.smoothed(STATS, exact=True)
+    expected = batch_smoothing(values, 25)
+    np.testing.assert_array_equal(sorted_values, np.sort(values[~np.isnan(values)]))
+    for stat in STATS:
+        np.testing.assert_allclose(smoothed[stat], expected[stat])
+
+def test_maintained_smoothing_uses_current_bins():
+    state = IncrementalBinning.from_values(np.arange(12.0), nbins=3)
+    _, smoothed = state.smoothed(("mean", "boundaries"))
+    np.testing.assert_array_equal(smoothed["mean"], np.repeat([1.5, 5.5, 9.5], 4))
+    np.testing.assert_array_equal(smoothed["boundaries"], [0, 0, 3, 3, 4, 4, 7, 7, 8, 8, 11, 11])
+
+def test_save_load_round_trip(tmp_path):
+    values = np.random.default_rng(3).lognormal(size=500)
+    state = IncrementalBinning.from_values(values, nbins=8)
+    state.save(tmp_path / "state")
+    loaded = IncrementalBinning.load(tmp_path / "state")
+    np.testing.assert_array_equal(loaded.sorted_values, state.sorted_values)
+    np.testing.assert_array_equal(loaded.counts, state.counts)
+    np.testing.assert_allclose(loaded.sums, state.sums)
+
+def test_refresh_appends_new_rows_and_rebuilds_on_edit(tmp_path):
+    path = str(tmp_path / "state")
+    values = np.random.default_rng(4).lognormal(size=4000)
+    IncrementalBinning.refresh(path, values[:3000], nbins=16)
+    state, changed = IncrementalBinning.refresh(path, values, nbins=16)
+    # Only the bins the new rows landed in (and their re-split neighbours) changed
+    assert 0 < len(changed) <= 16
+    assert state.source_rows == len(values)
+    _, smoothed = state.smoothed(STATS, exact=True)
+    expected = batch_smoothing(values, 16)
+    for stat in STATS:
+        np.testing.assert_allclose(smoothed[stat], expected[stat])
+
+    # An edited first row no longer matches the stored rows: full rebuild
+    edited = values.copy()
+    edited[0] += 1.0
+    state, changed = IncrementalBinning.refresh(path, edited, nbins=16)
+    assert len(changed) == 16
+    np.testing.assert_array_equal(state.sorted_values, np.sort(edited))
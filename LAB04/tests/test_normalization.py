@@ -0,0 +1,100 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the LAB04 directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_processing.normalization import (grouped_scaling, scale_columns, minmax_scaling,
+                                             zscore_scaling, decimal_scaling, robust_scaling,
+                                             MinMaxScaler, ZScoreScaler, DecimalScaler,
+                                             RobustScaler)
+
+SCALERS = {
+    "minmax": (MinMaxScaler, minmax_scaling),
+    "zscore": (ZScoreScaler, zscore_scaling),
+    "decimal": (DecimalScaler, decimal_scaling),
+}
+
+def sample_columns():
+    rng = np.random.default_rng(0)
+    return np.column_stack([rng.normal(50, 10, 3000), rng.lognormal(3, 1, 3000), rng.uniform(-5, 5, 3000)])
+
+def test_grouped_scaling_without_valid_group():
+    for method in ("minmax", "zscore", "decimal"):
+        out = grouped_scaling(np.array([1.0, 2.0, 3.0]), np.array([-1, -1, -1]), method)
+        assert out.shape == (3,)
+        assert np.isnan(out).all()
+
+def test_grouped_scaling_matches_per_group_minmax():
+    data = np.array([[1.0, 10.0], [3.0, np.nan], [2.0, 30.0], [5.0, 5.0], [7.0, 9.0]])
+    codes = np.array([0, 0, 0, 1, -1])
+    out = grouped_scaling(data, codes, "minmax")
+    expected = np.array([[0.0, 0.0], [1.0, np.nan], [0.5, 1.0], [np.nan, np.nan], [np.nan, np.nan]])
+    # A single-row group has zero range, like the ungrouped scalers
+    expected[3] = np.nan
+    np.testing.assert_allclose(out, expected, equal_nan=True)
+
+def test_scale_columns_matches_per_column_functions():
+    data = sample_columns()
+    for method, (_, reference) in SCALERS.items():
+        expected = np.column_stack([reference(data[:, j]) for j in range(data.shape[1])])
+        np.testing.assert_allclose(scale_columns(data, method), expected)
+    expected = np.column_stack([robust_scaling(data[:, j]) for j in range(data.shape[1])])
+    np.testing.assert_allclose(scale_columns(data, "robust"), expected)
+
+def test_chunked_fit_matches_batch_scaling():
+    data = sample_columns()
+    for scaler_cls, reference in SCALERS.values():
+        scaler = scaler_cls()
+        for chunk in np.array_split(data, 7):
+            scaler.partial_fit(chunk)
+        expected = np.column_stack([reference(data[:, j]) for j in range(data.shape[1])])
+        np.testing.assert_allclose(scaler.transform(data), expected)
+        np.testing.assert_allclose(scaler.inverse_transform(scaler.transform(data)), data)
+
+def test_chunked_fit_ignores_nan_and_empty_chunks():
+    data = np.array([1.0, np.nan, 4.0, 2.0, np.nan, 8.0])
+    for scaler_cls, reference in SCALERS.values():
+        scaler = scaler_cls()
+        for chunk in (data[:2], np.array([np.nan]), data[2:]):
+            scaler.partial_fit(chunk)
+        expected = reference(pd.Series(data)).to_numpy()
+        np.testing.assert_allclose(scaler.transform(data), expected, equal_nan=True)
+
+def test_robust_scaler_close_to_exact_percentiles():
+    data = sample_columns()
+    left = RobustScaler(error=0.002, seed=1).partial_fit(data[:1500])
+    right = RobustScaler(error=0.002, seed=2).partial_fit(data[1500:])
+    merged = RobustScaler(error=0.002).merge(left).merge(right)
+    q1, _, q3 = merged._quantiles()
+    # Sketch quantiles are within a small rank error of the exact ones
+    for j in range(data.shape[1]):
+        column = np.sort(data[:, j])
+        ranks = np.searchsorted(column, [q1[j], merged.center[j], q3[j]], side="right") / len(column)
+        np.testing.assert_allclose(ranks, [0.25, 0.5, 0.75], atol=3 * 0.002)
+    expected = np.column_stack([robust_scaling(data[:, j]) for j in range(data.shape[1])])
+    assert np.median(np.abs(merged.transform(data) - expected)) < 0.05
+
+def test_scalers_dict_and_file_round_trip(tmp_path):
+    data = sample_columns()
+    for scaler_cls, _ in SCALERS.values():
+        scaler = scaler_cls().fit(data)
+        restored = scaler_cls.from_dict(json.loads(json.dumps(scaler.to_dict())))
+        np.testing.assert_allclose(restored.transform(data), scaler.transform(data))
+        scaler.save(tmp_path / "scaler.json")
+        np.testing.assert_allclose(scaler_cls.load(tmp_path / "scaler.json").transform(data),
+                                   scaler.transform(data))
+    robust = RobustScaler(seed=3).fit(data)
+    restored = RobustScaler.from_dict(json.loads(json.dumps(robust.to_dict())))
+    np.testing.assert_allclose(restored.transform(data), robust.transform(data))
+
+def test_from_dict_rejects_other_scaler():
+    with pytest.raises(ValueError):
+        ZScoreScaler.from_dict(MinMaxScaler().fit(sample_columns()).to_dict())
+    with pytest.raises(RuntimeError):
+        MinMaxScaler().transform([1.0])
@@ -0,0 +1,128 @@
+import importlib
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Add the LAB04 directory (src) and the repository root (labtools) to Python path
+LAB04_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(LAB04_DIR)
+sys.path.append(os.path.dirname(LAB04_DIR))
+
+from src.utils.pipeline import Pipeline
+
+# Names of the stages that actually ran, in order
+CALLS = []
+
+def total(df):
+    CALLS.append("total")
+    return float(df["x"].sum())
+
+def doubled(t):
+    CALLS.append("doubled")
+    return 2 * t
+
+def count(df):
+    CALLS.append("count")
+    return len(df)
+
+def report(t, n):
+    CALLS.append("report")
+    return t / n
+
+def build(cache_dir):
+    # Declared out of dependency order on purpose
+    return (Pipeline("test", cache_dir=str(cache_dir))
+            .add(report, inputs=("doubled", "count"), provides="report")
+            .add(doubled, inputs=("total",), provides="doubled")
+            .add(total, provides="total")
+            .add(count, provides="count"))
+
+@pytest.fixture(autouse=True)
+def clear_calls():
+    CALLS.clear()
+
+def test_stages_run_after_their_inputs(tmp_path):
+    values, skipped = build(tmp_path).run(max_workers=1, df=pd.DataFrame({"x": [1.0, 2.0, 3.0]}))
+    assert skipped == []
+    assert values["total"] == 6.0 and values["doubled"] == 12.0 and values["report"] == 4.0
+    assert CALLS.index("total") < CALLS.index("doubled") < CALLS.index("report")
+    assert CALLS.index("count") < CALLS.index("report")
+
+def test_unsatisfiable_inputs(tmp_path):
+    pipeline = Pipeline("test", cache_dir=str(tmp_path)).add(doubled, inputs=("missing",))
+    with pytest.raises(ValueError, match="missing"):
+        pipeline.run(max_workers=1, df=pd.DataFrame({"x": [1.0]}))
+
+def test_unchanged_stages_are_skipped(tmp_path):
+    df = pd.DataFrame({"x": [1.0, 2.0, 3.0]})
+    first, _ = build(tmp_path).run(max_workers=1, df=df)
+    CALLS.clear()
+    values, skipped = build(tmp_path).run(max_workers=1, df=df.copy())
+    assert CALLS == []
+    assert sorted(skipped) == ["count", "doubled", "report", "total"]
+    # Skipped stages still provide their cached results
+    assert all(values[k] == first[k] for k in ("total", "doubled", "count", "report"))
+
+def test_changed_input_reruns_dependent_stages(tmp_path):
+    build(tmp_path).run(max_workers=1, df=pd.DataFrame({"x": [1.0, 2.0, 3.0]}))
+    CALLS.clear()
+    values, skipped = build(tmp_path).run(max_workers=1, df=pd.DataFrame({"x": [1.0, 2.0, 5.0]}))
+    assert sorted(CALLS) == ["count", "doubled", "report", "total"]
+    assert skipped == []
+    assert values["report"] == 16.0 / 3
+
+def test_stages_with_equal_inputs_stay_skipped(tmp_path):
+    build(tmp_path).run(max_workers=1, df=pd.DataFrame({"x": [1.0, 2.0, 3.0]}))
+    CALLS.clear()
+    # New frame, same total and length: only the stages reading df rerun
+    _, skipped = build(tmp_path).run(max_workers=1, df=pd.DataFrame({"x": [3.0, 2.0, 1.0]}))
+    assert sorted(CALLS) == ["count", "total"]
+    assert sorted(skipped) == ["doubled", "report"]
+
+def test_force_and_missing_outputs_rerun(tmp_path):
+    out = tmp_path / "out.txt"
+
+    def pipeline():
+        return Pipeline("test", cache_dir=str(tmp_path)).add(count, outputs=(str(out),))
+
+    df = pd.DataFrame({"x": [1.0]})
+    out.write_text("x")
+    pipeline().run(max_workers=1, df=df)
+    assert pipeline().run(max_workers=1, df=df)[1] == ["count"]
+    assert pipeline().run(max_workers=1, force=True, df=df)[1] == []
+    out.unlink()
+    assert pipeline().run(max_workers=1, df=df)[1] == []
+    assert CALLS == ["count"] * 3
+
+def test_edited_imported_module_reruns_stage(tmp_path, monkeypatch):
+    src = tmp_path / "project"
+    src.mkdir()
+    (src / "pipeline_helper.py").write_text("SCALE = 2\n")
+    (src / "pipeline_stages.py").write_text(
+        "from pipeline_helper import SCALE\n\n"
+        "def scaled(df):\n"
+        "    return SCALE * len(df)\n")
+    monkeypatch.syspath_prepend(str(src))
+    stages = importlib.import_module("pipeline_stages")
+    df = pd.DataFrame({"x": [1.0, 2.0]})
+
+    def run():
+        pipeline = Pipeline("test", cache_dir=str(tmp_path / "cache")).add(stages.scaled, provides="s")
+        return pipeline.run(max_workers=1, df=df)[1]
+
+    assert run() == []
+    assert run() == ["scaled"]
+    # A module the stage imports changes: its code digest changes too
+    (src / "pipeline_helper.py").write_text("SCALE = 3\n")
+    assert run() == []
+    assert run() == ["scaled"]
+
+def test_parallel_run_matches_serial_run(tmp_path):
+    df = pd.DataFrame({"x": [1.0, 2.0, 3.0, 4.0]})
+    serial, _ = build(tmp_path / "serial").run(max_workers=1, df=df)
+    # total and count share a wave and run in pool workers
+    parallel, skipped = build(tmp_path / "parallel").run(max_workers=2, df=df)
+    assert skipped == []
+    assert all(parallel[k] == serial[k] for k in ("total", "doubled", "count", "report"))
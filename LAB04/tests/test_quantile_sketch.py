@@ -0,0 +1,65 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the LAB04 directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_processing.quantile_sketch import KLLSketch
+
+QS = np.linspace(0.01, 0.99, 25)
+
+def empirical_rank(values, x):
+    return np.searchsorted(np.sort(values), x, side="right") / len(values)
+
+def test_quantiles_within_rank_error_of_numpy():
+    values = np.random.default_rng(0).lognormal(11, 2, 200_000)
+    sketch = KLLSketch.from_error(0.01, seed=1)
+    for chunk in np.array_split(values, 50):
+        sketch.update(chunk)
+    assert len(sketch) == len(values)
+    # Compare in rank space: each estimate sits close to the requested rank
+    ranks = empirical_rank(values, sketch.quantiles(QS))
+    assert np.max(np.abs(ranks - QS)) < 3 * sketch.error
+    assert sum(len(level) for level in sketch.levels) < len(values) / 50
+
+def test_rank_matches_empirical_rank():
+    values = np.random.default_rng(2).normal(size=50_000)
+    sketch = KLLSketch(k=400, seed=3).update(values)
+    x = np.quantile(values, QS)
+    assert np.max(np.abs(sketch.rank(x) - empirical_rank(values, x))) < 3 * sketch.error
+
+def test_small_input_is_exact():
+    values = np.array([5.0, 1.0, 4.0, 2.0, 3.0])
+    sketch = KLLSketch(k=200).update(values)
+    np.testing.assert_array_equal(sketch.quantiles([0.0, 0.4, 1.0]), [1.0, 2.0, 5.0])
+
+def test_nans_ignored_and_empty_sketch():
+    sketch = KLLSketch()
+    assert np.isnan(sketch.quantiles(0.5)).all()
+    sketch.update([np.nan, 1.0, np.nan])
+    assert len(sketch) == 1
+    assert sketch.quantiles(0.5)[0] == 1.0
+
+def test_merge_matches_single_sketch():
+    rng = np.random.default_rng(4)
+    parts = [rng.exponential(size=30_000) for _ in range(4)]
+    merged = KLLSketch(k=200, seed=5)
+    for part in parts:
+        merged.merge(KLLSketch(k=200, seed=6).update(part))
+    values = np.concatenate(parts)
+    assert len(merged) == len(values)
+    ranks = empirical_rank(values, merged.quantiles(QS))
+    assert np.max(np.abs(ranks - QS)) < 3 * merged.error
+
+def test_merge_rejects_other_k():
+    with pytest.raises(ValueError):
+        KLLSketch(k=100).merge(KLLSketch(k=200))
+
+def test_dict_round_trip():
+    sketch = KLLSketch(k=64, seed=7).update(np.random.default_rng(8).normal(size=10_000))
+    restored = KLLSketch.from_dict(sketch.to_dict())
+    assert len(restored) == len(sketch)
+    np.testing.assert_array_equal(restored.quantiles(QS), sketch.quantiles(QS))
@@ -0,0 +1,62 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the LAB04 directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_processing.resampling import resample_weekly, split_weeks_by_month
+
+def weekly_rows(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2015-01-04", periods=60, freq="7D")
+    volume = rng.lognormal(8, 1, n)
+    volume[::41] = np.nan
+    return pd.DataFrame({
+        "date": dates[rng.integers(len(dates), size=n)],
+        "region": rng.choice(["Albany", "Boston"], n),
+        "total_volume": volume,
+    })
+
+def daily_reference(df, freq, by=(), days=7, anchor="start"):
+    # Spread every weekly value evenly over its days, then let pandas resample
+    offset = 0 if anchor == "start" else -(days - 1)
+    daily = df.loc[df.index.repeat(days)].copy()
+    daily["date"] = daily["date"] + pd.to_timedelta(np.tile(np.arange(days) + offset, len(df)), unit="D")
+    daily["total_volume"] = daily["total_volume"].fillna(0) / days
+    grouper = [*by, pd.Grouper(key="date", freq=freq)]
+    out = daily.groupby(grouper)["total_volume"].sum()
+    return out[out.index.get_level_values("date").notna()]
+
+@pytest.mark.parametrize("period, freq", [("month", "MS"), ("quarter", "QS"), ("year", "YS")])
+def test_matches_daily_pandas_resample(period, freq):
+    df = weekly_rows()
+    result = resample_weekly(df, period=period)
+    expected = daily_reference(df, freq)
+    expected = expected[expected != 0]
+    result = result[result["total_volume"] != 0]
+    np.testing.assert_allclose(result["total_volume"].to_numpy(), expected.to_numpy())
+    if period == "month":
+        assert result[period].tolist() == expected.index.strftime("%Y-%m").tolist()
+
+def test_grouped_and_end_anchored_match_reference():
+    df = weekly_rows(seed=1)
+    result = resample_weekly(df, by=("region",), anchor="end")
+    expected = daily_reference(df, "MS", by=("region",), anchor="end")
+    expected = expected[expected != 0].reset_index()
+    result = result[result["total_volume"] != 0].reset_index(drop=True)
+    assert result["region"].tolist() == expected["region"].tolist()
+    np.testing.assert_allclose(result["total_volume"], expected["total_volume"])
+
+def test_split_weights_sum_to_one():
+    dates = pd.Series(pd.to_datetime(["2015-01-29", "2015-02-01", None, "2016-02-26"]))
+    rows, months, weights = split_weeks_by_month(dates)
+    assert sorted(set(rows)) == [0, 1, 3]
+    np.testing.assert_allclose(np.bincount(rows, weights=weights)[[0, 1, 3]], 1.0)
+    # 2015-01-29 .. 2015-02-04: 3 days in January, 4 in February
+    first = rows == 0
+    np.testing.assert_allclose(np.sort(weights[first]), [3 / 7, 4 / 7])
+    assert set(months[first]) == {2015 * 12, 2015 * 12 + 1}
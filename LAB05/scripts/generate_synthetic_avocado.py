@@ -0,0 +1,244 @@
+"""
+Synthetic avocado dataset generator.
+
+Writes CSVs with the schema of data/avocado.csv (Date, AveragePrice, Total
+Volume, PLU columns, bags, type, year, region) at any size, calibrated on
+the real file: every (region, type) series keeps its volume level, its
+monthly seasonality, its price level and its PLU / bag shares. Series beyond
+the 108 real ones are clones of real profiles under new region names with a
+jittered level. Output is seeded and written in chunks, so 1M-100M rows
+never have to fit in memory; the same seed always gives the same rows.
+
+Examples:
+    python generate_synthetic_avocado.py --rows 1000000
+    python generate_synthetic_avocado.py --rows 100000000 --output ../data/avocado_100m.csv.gz
+    python generate_synthetic_avocado.py --trail
+"""
+import argparse
+import gzip
+import math
+import numpy as np
+import pandas as pd
+from utils import setup_paths, read_csv_cached
+
+PLU_COLUMNS = ['4046', '4225', '4770', 'Total Bags']
+BAG_COLUMNS = ['Small Bags', 'Large Bags', 'XLarge Bags']
+COLUMNS = (['Date', 'AveragePrice', 'Total Volume'] + PLU_COLUMNS + BAG_COLUMNS
+           + ['type', 'year', 'region'])
+
+# Missing-value spellings found in the real files
+AVOCADO_NA_MARKERS = ['', 'nil', 'na', 'NAN']
+TRAIL_NA_MARKERS = ['NA', 'n/a', 'N/A', 'NAN', 'na', 'nan']
+
+# Series are generated in fixed blocks, each with its own seed, so the
+# output does not depend on the chunk size
+SERIES_PER_BLOCK = 64
+
+def build_profiles(df):
+    """
+    Per (region, type) parameters estimated from the real dataset.
+
+    Returns:
+        DataFrame indexed by (region, type) with the log-volume level and
+        noise, 12 monthly log-volume offsets, price level, noise and 12
+        monthly price offsets, and the mean PLU / bag shares
+    """
+    df = df.copy()
+    df['AveragePrice'] = pd.to_numeric(df['AveragePrice'], errors='coerce')
+    df['month'] = pd.to_datetime(df['Date'], dayfirst=True).dt.month
+    df['log_volume'] = np.log1p(df['Total Volume'])
+    keys = ['region', 'type']
+    grouped = df.groupby(keys)
+
+    profiles = pd.DataFrame({
+        'level': grouped['log_volume'].mean(),
+        'price': grouped['AveragePrice'].mean(),
+        'price_noise': grouped['AveragePrice'].std().fillna(0.1),
+    })
+    volume_by_month = df.groupby(keys + ['month'])['log_volume'].mean().unstack('month')
+    price_by_month = df.groupby(keys + ['month'])['AveragePrice'].mean().unstack('month')
+    season = volume_by_month.sub(profiles['level'], axis=0).fillna(0.0)
+    price_season = price_by_month.sub(profiles['price'], axis=0).fillna(0.0)
+    for m in range(1, 13):
+        profiles[f'season_{m}'] = season.get(m, 0.0)
+        profiles[f'price_season_{m}'] = price_season.get(m, 0.0)
+
+    # Noise left after removing the seasonal level
+    residual = df['log_volume'] - df.join(volume_by_month.stack().rename('fit'), on=keys + ['month'])['fit']
+    profiles['noise'] = residual.groupby([df['region'], df['type']]).std().fillna(0.1)
+
+    total = df['Total Volume'].where(df['Total Volume'] > 0)
+    bags = df['Total Bags'].where(df['Total Bags'] > 0)
+    for col in PLU_COLUMNS:
+        profiles[f'share_{col}'] = (df[col] / total).groupby([df['region'], df['type']]).mean()
+    for col in BAG_COLUMNS:
+        profiles[f'share_{col}'] = (df[col] / bags).groupby([df['region'], df['type']]).mean()
+    return profiles.fillna(0.0)
+
+def _series_table(profiles, n_series, rng):
+    """Profiles of `n_series` series: the real ones first, then jittered clones."""
+    base = profiles.reset_index()
+    idx = np.arange(n_series) % len(base)
+    table = base.iloc[idx].reset_index(drop=True)
+    clone = np.arange(n_series) // len(base)
+    # Clones get their own region name and a shifted volume level
+    table['region'] = np.where(clone > 0, table['region'] + clone.astype(str), table['region'])
+    table['level'] = table['level'] + np.where(clone > 0, rng.normal(0, 0.5, n_series), 0.0)
+    return table
+
+def _split(total, shares, rng, noise=0.15):
+    """Split totals into parts around the profile shares (rows sum to total)."""
+    weights = np.maximum(shares, 1e-6) * np.exp(rng.normal(0, noise, shares.shape))
+    return total[:, None] * weights / weights.sum(axis=1, keepdims=True)
+
+def generate_block(series, dates, rng):
+    """
+    Generate all weeks of a block of series.
+
+    Args:
+        series: Rows of the series table for this block
+        dates: Week dates (DatetimeIndex, newest first like the real file)
+        rng: numpy Generator for this block
+
+    Returns:
+        DataFrame with the avocado schema, one row per series and week
+    """
+    n_series, n_weeks = len(series), len(dates)
+    months = dates.month.to_numpy() - 1
+
+    # Log volume: level + monthly seasonality + AR(1) noise per series
+    season = series[[f'season_{m}' for m in range(1, 13)]].to_numpy()[:, months]
+    shocks = rng.normal(0, 1, (n_series, n_weeks)) * series['noise'].to_numpy()[:, None]
+    noise = np.empty_like(shocks)
+    noise[:, 0] = shocks[:, 0]
+    for w in range(1, n_weeks):
+        noise[:, w] = 0.6 * noise[:, w - 1] + 0.8 * shocks[:, w]
+    log_volume = series['level'].to_numpy()[:, None] + season + noise
+    volume = np.expm1(log_volume).ravel()
+
+    # Price follows its own seasonality and moves against volume surprises
+    price_season = series[[f'price_season_{m}' for m in range(1, 13)]].to_numpy()[:, months]
+    price = (series['price'].to_numpy()[:, None] + price_season - 0.05 * noise
+             + rng.normal(0, 0.5, (n_series, n_weeks)) * series['price_noise'].to_numpy()[:, None])
+    price = np.clip(price, 0.25, None).ravel()
+
+    rows = np.repeat(np.arange(n_series), n_weeks)
+    plu = _split(volume, series[[f'share_{c}' for c in PLU_COLUMNS]].to_numpy()[rows], rng)
+    bags = _split(plu[:, -1], series[[f'share_{c}' for c in BAG_COLUMNS]].to_numpy()[rows], rng)
+
+    week = np.tile(np.arange(n_weeks), n_series)
+    block = pd.DataFrame({
+        'Date': np.asarray(dates.strftime('%d-%m-%Y'))[week],
+        'AveragePrice': price.round(2),
+        'Total Volume': volume.round(2),
+    })
+    for i, col in enumerate(PLU_COLUMNS):
+        block[col] = plu[:, i].round(2)
+    for i, col in enumerate(BAG_COLUMNS):
+        block[col] = bags[:, i].round(2)
+    block['type'] = series['type'].to_numpy()[rows]
+    block['year'] = dates.year.to_numpy()[week]
+    block['region'] = series['region'].to_numpy()[rows]
+    return block
+
+def make_dirty(block, rng, missing_rate, duplicate_rate, na_markers):
+    """Blank out AveragePrice with mixed NA spellings, then insert exact duplicate rows."""
+    if missing_rate > 0:
+        missing = np.flatnonzero(rng.random(len(block)) < missing_rate)
+        if len(missing):
+            price = block['AveragePrice'].astype(object)
+            price.iloc[missing] = np.asarray(na_markers, dtype=object)[
+                rng.integers(len(na_markers), size=len(missing))]
+            block['AveragePrice'] = price
+    if duplicate_rate > 0:
+        copies = 1 + (rng.random(len(block)) < duplicate_rate)
+        block = block.iloc[np.repeat(np.arange(len(block)), copies)].reset_index(drop=True)
+    return block
+
+def generate(output, rows, seed=0, weeks=169, start='2015-01-04', chunksize=1_000_000,
+             missing_rate=0.0015, duplicate_rate=0.0, na_markers=AVOCADO_NA_MARKERS,
+             regions=None, profiles=None):
+    """
+    Write a synthetic avocado CSV of about `rows` rows (before duplicates).
+
+    Args:
+        output: Target path (".gz" suffix writes gzip-compressed CSV)
+        rows: Number of rows to generate; rounded up to whole series
+        seed: Random seed
+        weeks: Weekly dates per series, starting on `start`
+        start: First week (a Sunday, like the real data)
+        chunksize: Approximate rows per written chunk
+        missing_rate: Fraction of AveragePrice values written as NA markers
+        duplicate_rate: Fraction of rows written twice
+        na_markers: Spellings used for missing prices
+        regions: Restrict the calibration profiles to these regions
+        profiles: Precomputed `build_profiles` output
+
+    Returns:
+        Number of rows written (including duplicates)
+    """
+    if profiles is None:
+        data_dir = setup_paths()[0]
+        profiles = build_profiles(read_csv_cached(data_dir / 'avocado.csv'))
+    if regions is not None:
+        profiles = profiles[profiles.index.get_level_values('region').isin(regions)]
+    # Newest week first, as in the real file
+    dates = pd.date_range(start, periods=weeks, freq='7D')[::-1]
+    n_series = math.ceil(rows / weeks)
+    series = _series_table(profiles, n_series, np.random.default_rng([seed, 0]))
+
+    blocks_per_chunk = max(1, chunksize // (weeks * SERIES_PER_BLOCK))
+    n_blocks = math.ceil(n_series / SERIES_PER_BLOCK)
+    opener = gzip.open if str(output).endswith('.gz') else open
+    written = 0
+    with opener(output, 'wt', newline='') as f:
+        for first in range(0, n_blocks, blocks_per_chunk):
+            parts = []
+            for b in range(first, min(first + blocks_per_chunk, n_blocks)):
+                rng = np.random.default_rng([seed, b + 1])
+                block = generate_block(series.iloc[b * SERIES_PER_BLOCK:(b + 1) * SERIES_PER_BLOCK],
+                                       dates, rng)
+                parts.append(make_dirty(block, rng, missing_rate, duplicate_rate, na_markers))
+            chunk = pd.concat(parts, ignore_index=True)
+            chunk.to_csv(f, header=(written == 0), index=False, columns=COLUMNS)
+            written += len(chunk)
+            print(f"  {written:,} rows written", end='\r')
+    print()
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic avocado dataset.')
+    parser.add_argument('--rows', type=int, help='rows to generate before duplicates (default 1M, 200 with --trail)')
+    parser.add_argument('--output', help='output CSV path (.csv or .csv.gz)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--weeks', type=int, default=169, help='weekly dates per region and type')
+    parser.add_argument('--chunksize', type=int, default=1_000_000, help='rows per written chunk')
+    parser.add_argument('--missing-rate', type=float, default=None,
+                        help='fraction of AveragePrice values written as NA markers')
+    parser.add_argument('--duplicate-rate', type=float, default=None, help='fraction of rows written twice')
+    parser.add_argument('--trail', action='store_true',
+                        help='dirty Trail.csv variant: 2015 weeks of 7 regions, frequent NAs and duplicates')
+    args = parser.parse_args()
+
+    data_dir = setup_paths()[0]
+    if args.trail:
+        # Same shape as data/Trail.csv: 2015 only, a handful of regions
+        options = dict(rows=args.rows or 200, weeks=min(args.weeks, 50),
+                       start='2015-01-04', missing_rate=0.12, duplicate_rate=0.035,
+                       na_markers=TRAIL_NA_MARKERS,
+                       regions=['Albany', 'Atlanta', 'BaltimoreWashington', 'Boise', 'Boston',
+                                'BuffaloRochester', 'California'])
+        output = args.output or data_dir / 'Trail_synthetic.csv'
+    else:
+        options = dict(rows=args.rows or 1_000_000, weeks=args.weeks)
+        output = args.output or data_dir / f"avocado_synthetic_{options['rows']}.csv"
+    if args.missing_rate is not None:
+        options['missing_rate'] = args.missing_rate
+    if args.duplicate_rate is not None:
+        options['duplicate_rate'] = args.duplicate_rate
+
+    written = generate(output, seed=args.seed, chunksize=args.chunksize, **options)
+    print(f"Wrote {written:,} rows to {output}")
+
+if __name__ == '__main__':
+    main()
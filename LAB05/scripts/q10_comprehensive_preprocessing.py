@@ -7,16 +7,23 @@ import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
-from utils import setup_paths, save_plot, save_table, PASTEL_COLORS
+from utils import (setup_paths, save_plot, save_table, read_csv_cached, use_plot_style,
+                   PASTEL_COLORS, instrumented, stage, write_report)
 
+@instrumented
 def comprehensive_preprocessing():
     # Setup paths
-    data_dir, _, plots_dir, tables_dir = setup_paths()
+    data_dir, output_dir, plots_dir, tables_dir = setup_paths()
+    # Agg backend and the shared plot style, before anything is drawn
+    use_plot_style()
     
     # Read only the avocado dataset
-    avocado_df = pd.read_csv(data_dir / 'avocado.csv')
+    with stage('read_avocado') as s:
+        avocado_df = read_csv_cached(data_dir / 'avocado.csv')
+        s.rows_out = len(avocado_df)
     
     # 1. Data Cleaning
+    @instrumented
     def clean_dataset(df, name):
         # Create a copy of the DataFrame
         df_cleaned = df.copy()
@@ -39,12 +46,13 @@ def comprehensive_preprocessing():
             df_cleaned.loc[:, categorical_cols] = cat_imputer.fit_transform(df_cleaned[categorical_cols])
         
         # Save cleaned dataset
-        save_table(df_cleaned, f'q10_cleaned_{name}.csv', tables_dir)
+        save_table(df_cleaned, f'q10_cleaned_{name}.csv', tables_dir, full_dataset=True)
         return df_cleaned
     
     avocado_cleaned = clean_dataset(avocado_df, 'avocado')
     
     # 2. Data Transformation
+    @instrumented
     def transform_dataset(df, name):
         # Standardization
         scaler = StandardScaler()
@@ -59,12 +67,13 @@ def comprehensive_preprocessing():
             df_scaled[col] = le.fit_transform(df[col])
         
         # Save transformed dataset
-        save_table(df_scaled, f'q10_transformed_{name}.csv', tables_dir)
+        save_table(df_scaled, f'q10_transformed_{name}.csv', tables_dir, full_dataset=True)
         return df_scaled
     
     avocado_transformed = transform_dataset(avocado_cleaned, 'avocado')
     
     # 3. Feature Selection
+    @instrumented
     def select_features(df, target_col, name):
         # Separate features and target
         X = df.drop(columns=[target_col])
@@ -89,7 +98,7 @@ def comprehensive_preprocessing():
         plt.title(f'Feature Selection Scores ({name})')
         plt.xlabel('F-score')
         plt.tight_layout()
-        save_plot(plt, f'q10_feature_scores_{name}.png', plots_dir)
+        save_plot(plt, f'q10_feature_scores_{name}.png', plots_dir, data=scores, source=__file__)
         
         return selected_features
     
@@ -109,3 +118,5 @@ def comprehensive_preprocessing():
 
 if __name__ == '__main__':
     comprehensive_preprocessing()
+    # Per-stage timing / memory report (only with STAGE_PROFILE=1)
+    write_report('q10', setup_paths()[1] / 'profiles')
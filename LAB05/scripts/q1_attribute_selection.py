@@ -2,18 +2,24 @@ import pandas as pd
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-from utils import setup_paths, save_plot, save_table, PASTEL_COLORS
+from utils import (setup_paths, save_plot, save_table, read_csv_cached, use_plot_style,
+                   PASTEL_COLORS, instrumented, stage, write_report)
 
+@instrumented
 def process_organic_avocados():
     # Setup paths
     data_dir, output_dir, plots_dir, tables_dir = setup_paths()
+    # Agg backend and the shared plot style, before anything is drawn
+    use_plot_style()
     
     # Create calculations directory
     calculations_dir = output_dir / 'calculations'
     calculations_dir.mkdir(exist_ok=True)
     
     # Read the dataset
-    df = pd.read_csv(data_dir / 'avocado.csv')
+    with stage('read_avocado') as s:
+        df = read_csv_cached(data_dir / 'avocado.csv')
+        s.rows_out = len(df)
     
     # Select organic avocados and relevant columns
     organic_df = df[df['type'] == 'organic']
@@ -39,7 +45,7 @@ def process_organic_avocados():
     plt.title('Total Volume by PLU Code (Organic Avocados)')
     plt.xlabel('PLU Code')
     plt.ylabel('Total Volume')
-    save_plot(plt, 'q1_plu_volumes_bar.png', plots_dir)
+    save_plot(plt, 'q1_plu_volumes_bar.png', plots_dir, data=plu_volumes, source=__file__)
     
     # Save detailed calculations and summary
     with open(calculations_dir / 'q1_analysis_details.txt', 'w') as f:
@@ -78,3 +84,5 @@ def process_organic_avocados():
 
 if __name__ == '__main__':
     process_organic_avocados()
+    # Per-stage timing / memory report (only with STAGE_PROFILE=1)
+    write_report('q1', setup_paths()[1] / 'profiles')
@@ -2,18 +2,24 @@ import pandas as pd
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-from utils import setup_paths, save_plot, save_table, PASTEL_COLORS
+from utils import (setup_paths, save_plot, save_table, read_csv_cached, use_plot_style,
+                   PASTEL_COLORS, instrumented, stage, write_report)
 
+@instrumented
 def process_duplicates():
     # Setup paths
     data_dir, output_dir, plots_dir, tables_dir = setup_paths()
+    # Agg backend and the shared plot style, before anything is drawn
+    use_plot_style()
     
     # Create calculations directory
     calculations_dir = output_dir / 'calculations'
     calculations_dir.mkdir(exist_ok=True)
     
     # Read the Trail dataset
-    df = pd.read_csv(data_dir / 'Trail.csv', na_values=['NA', 'NaN', 'na', 'n/a', ''])
+    with stage('read_trail') as s:
+        df = read_csv_cached(data_dir / 'Trail.csv', na_values=['NA', 'NaN', 'na', 'n/a', ''])
+        s.rows_out = len(df)
     
     # Print original size
     original_size = len(df)
@@ -35,7 +41,7 @@ def process_duplicates():
     print(f"Dataset size after removing duplicates: {final_size}")
     
     # Save processed dataset as both CSV and PNG
-    save_table(df_no_duplicates, 'q2_processed_trail.csv', tables_dir, plots_dir)
+    save_table(df_no_duplicates, 'q2_processed_trail.csv', tables_dir, plots_dir, full_dataset=True)
     
     # Create summary DataFrame
     summary_df = pd.DataFrame({
@@ -53,7 +59,7 @@ def process_duplicates():
     plt.bar(['Original', 'After removing duplicates'], [original_size, final_size], color=PASTEL_COLORS[:2])
     plt.title('Dataset Size Comparison')
     plt.ylabel('Number of Records')
-    save_plot(plt, 'q2_size_comparison.png', plots_dir)
+    save_plot(plt, 'q2_size_comparison.png', plots_dir, data=[original_size, final_size], source=__file__)
     
     # Save detailed calculations and analysis
     with open(calculations_dir / 'q2_processing_details.txt', 'w') as f:
@@ -89,3 +95,5 @@ def process_duplicates():
 
 if __name__ == '__main__':
     process_duplicates()
+    # Per-stage timing / memory report (only with STAGE_PROFILE=1)
+    write_report('q2', setup_paths()[1] / 'profiles')
@@ -3,19 +3,25 @@ import matplotlib
 matplotlib.use('Agg')  # Must be before importing pyplot
 import numpy as np
 import matplotlib.pyplot as plt
-from utils import setup_paths, save_plot, save_table, PASTEL_COLORS
+from utils import (setup_paths, save_plot, save_table, read_csv_cached, use_plot_style,
+                   PASTEL_COLORS, instrumented, stage, write_report)
 
+@instrumented
 def binarize_year():
     try:
         # Setup paths
         data_dir, output_dir, plots_dir, tables_dir = setup_paths()
+        # Agg backend and the shared plot style, before anything is drawn
+        use_plot_style()
         
         # Create calculations directory
         calculations_dir = output_dir / 'calculations'
         calculations_dir.mkdir(exist_ok=True)
         
         # Read the dataset
-        df = pd.read_csv(data_dir / 'avocado.csv')
+        with stage('read_avocado') as s:
+            df = read_csv_cached(data_dir / 'avocado.csv')
+            s.rows_out = len(df)
         # Ensure year column is numeric
         df['year'] = pd.to_numeric(df['year'], errors='coerce')
         
@@ -42,7 +48,7 @@ def binarize_year():
             plt.text(i, v, str(v), ha='center', va='bottom')
         
         # Save plot and close figure
-        save_plot(plt, 'q3_year_distribution.png', plots_dir)
+        save_plot(plt, 'q3_year_distribution.png', plots_dir, data=year_counts, source=__file__)
         plt.close()
         
         # Save analysis to text file
@@ -72,6 +78,5 @@ def binarize_year():
 
 if __name__ == '__main__':
     binarize_year()
-
-if __name__ == '__main__':
-    binarize_year()
+    # Per-stage timing / memory report (only with STAGE_PROFILE=1)
+    write_report('q3', setup_paths()[1] / 'profiles')
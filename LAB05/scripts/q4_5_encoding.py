@@ -3,15 +3,21 @@ import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
-from utils import setup_paths, save_plot, save_table, PASTEL_COLORS
+from utils import (setup_paths, save_plot, save_table, read_csv_cached, use_plot_style,
+                   PASTEL_COLORS, instrumented, stage, write_report)
 from sklearn.preprocessing import LabelEncoder
 
+@instrumented
 def encode_categories():
     # Setup paths
     data_dir, _, plots_dir, tables_dir = setup_paths()
+    # Agg backend and the shared plot style, before anything is drawn
+    use_plot_style()
     
     # Read the dataset
-    df = pd.read_csv(data_dir / 'avocado.csv')
+    with stage('read_avocado') as s:
+        df = read_csv_cached(data_dir / 'avocado.csv')
+        s.rows_out = len(df)
     
     # Integer Encoding for all categorical attributes
     categorical_cols = df.select_dtypes(include=['object']).columns
@@ -27,7 +33,7 @@ def encode_categories():
     df = pd.concat([df, region_encoded], axis=1)
     
     # Save processed dataset
-    save_table(df, 'q4_5_encoded_data.csv', tables_dir)
+    save_table(df, 'q4_5_encoded_data.csv', tables_dir, full_dataset=True)
     
     # Visualize integer encoding
     plt.figure(figsize=(12, 6))
@@ -36,7 +42,8 @@ def encode_categories():
         sns.boxplot(data=df, y=f'{col}_encoded', color=PASTEL_COLORS[i])
         plt.title(f'{col} Encoding')
     plt.tight_layout()
-    save_plot(plt, 'q4_integer_encoding.png', plots_dir)
+    save_plot(plt, 'q4_integer_encoding.png', plots_dir,
+              data=df[[f'{col}_encoded' for col in categorical_cols]], source=__file__)
     
     # Visualize one-hot encoding distribution
     plt.figure(figsize=(15, 6))
@@ -44,7 +51,7 @@ def encode_categories():
     plt.title('Distribution of Regions (One-Hot Encoded)')
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    save_plot(plt, 'q5_onehot_encoding.png', plots_dir)
+    save_plot(plt, 'q5_onehot_encoding.png', plots_dir, data=region_encoded.sum(), source=__file__)
     
     # Create mapping table
     mapping_df = pd.DataFrame()
@@ -60,3 +67,5 @@ def encode_categories():
 
 if __name__ == '__main__':
     encode_categories()
+    # Per-stage timing / memory report (only with STAGE_PROFILE=1)
+    write_report('q4_5', setup_paths()[1] / 'profiles')
@@ -3,14 +3,20 @@ import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import seaborn as sns
-from utils import setup_paths, save_plot, save_table, PASTEL_COLORS
+from utils import (setup_paths, save_plot, save_table, read_csv_cached, use_plot_style,
+                   PASTEL_COLORS, instrumented, stage, write_report)
 
+@instrumented
 def handle_missing_values():
     # Setup paths
     data_dir, _, plots_dir, tables_dir = setup_paths()
+    # Agg backend and the shared plot style, before anything is drawn
+    use_plot_style()
     
     # Read the dataset
-    df = pd.read_csv(data_dir / 'avocado.csv')
+    with stage('read_avocado') as s:
+        df = read_csv_cached(data_dir / 'avocado.csv')
+        s.rows_out = len(df)
     
     # Calculate nullity by column
     nullity = df.isnull().sum().sort_values(ascending=False)
@@ -31,7 +37,7 @@ def handle_missing_values():
     plt.ylabel('Percentage of Missing Values')
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    save_plot(plt, 'q6_7_nullity_distribution.png', plots_dir)
+    save_plot(plt, 'q6_7_nullity_distribution.png', plots_dir, data=nullity_percent, source=__file__)
     
     # Drop columns with high nullity (>50%)
     high_nullity_cols = nullity_percent[nullity_percent > 50].index
@@ -41,7 +47,7 @@ def handle_missing_values():
     df_no_nulls = df_cleaned.dropna()
     
     # Save processed datasets
-    save_table(df_cleaned, 'q6_7_cleaned_data.csv', tables_dir)
+    save_table(df_cleaned, 'q6_7_cleaned_data.csv', tables_dir, full_dataset=True)
     
     # Print summary
     print(f"Original dataset shape: {df.shape}")
@@ -57,7 +63,9 @@ def handle_missing_values():
     plt.ylabel('Number of Records')
     plt.xticks(rotation=45)
     plt.tight_layout()
-    save_plot(plt, 'q6_7_dataset_size_changes.png', plots_dir)
+    save_plot(plt, 'q6_7_dataset_size_changes.png', plots_dir, data=sizes, source=__file__)
 
 if __name__ == '__main__':
     handle_missing_values()
+    # Per-stage timing / memory report (only with STAGE_PROFILE=1)
+    write_report('q6_7', setup_paths()[1] / 'profiles')
@@ -1,17 +1,22 @@
-import pandas as pd
 import matplotlib
 matplotlib.use('Agg')
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from utils import setup_paths, save_plot, save_table, PASTEL_COLORS
+from utils import (setup_paths, save_plot, save_table, read_csv_cached, use_plot_style,
+                   PASTEL_COLORS, instrumented, stage, write_report)
 
+@instrumented
 def statistical_summary():
     # Setup paths
     data_dir, _, plots_dir, tables_dir = setup_paths()
+    # Agg backend and the shared plot style, before anything is drawn
+    use_plot_style()
     
     # Read the dataset
-    df = pd.read_csv(data_dir / 'avocado.csv')
+    with stage('read_avocado') as s:
+        df = read_csv_cached(data_dir / 'avocado.csv')
+        s.rows_out = len(df)
     
     # Basic dataset information
     dataset_info = {
@@ -41,7 +46,7 @@ def statistical_summary():
     plt.figure(figsize=(8, 6))
     plt.pie(class_dist.values, labels=class_dist.index, autopct='%1.1f%%', colors=PASTEL_COLORS)
     plt.title('Class Distribution (Type)')
-    save_plot(plt, 'q8_class_distribution.png', plots_dir)
+    save_plot(plt, 'q8_class_distribution.png', plots_dir, data=class_dist, source=__file__)
     
     # Correlation matrix
     plt.figure(figsize=(12, 10))
@@ -49,7 +54,7 @@ def statistical_summary():
     sns.heatmap(correlation_matrix, annot=True, cmap='RdYlBu', center=0)
     plt.title('Correlation Matrix')
     plt.tight_layout()
-    save_plot(plt, 'q8_correlation_matrix.png', plots_dir)
+    save_plot(plt, 'q8_correlation_matrix.png', plots_dir, data=correlation_matrix, source=__file__)
     
     # Skewness visualization
     plt.figure(figsize=(12, 6))
@@ -60,7 +65,7 @@ def statistical_summary():
     plt.ylabel('Skewness')
     plt.xticks(rotation=45, ha='right')
     plt.tight_layout()
-    save_plot(plt, 'q8_skewness.png', plots_dir)
+    save_plot(plt, 'q8_skewness.png', plots_dir, data=skewness, source=__file__)
     
     # Box plots for numerical attributes
     plt.figure(figsize=(15, 5))
@@ -69,7 +74,9 @@ def statistical_summary():
         sns.boxplot(y=df[col], color=PASTEL_COLORS[i % len(PASTEL_COLORS)])
         plt.title(col)
     plt.tight_layout()
-    save_plot(plt, 'q8_distributions.png', plots_dir)
+    save_plot(plt, 'q8_distributions.png', plots_dir, data=df[numerical_cols], source=__file__)
 
 if __name__ == '__main__':
     statistical_summary()
+    # Per-stage timing / memory report (only with STAGE_PROFILE=1)
+    write_report('q8', setup_paths()[1] / 'profiles')
@@ -1,11 +1,7 @@
 import pandas as pd
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.preprocessing import LabelEncoder
-import matplotlib.pyplot as plt
-from utils import setup_paths, save_plot, save_table, PASTEL_COLORS
+from utils import (setup_paths, save_plot, save_table, read_csv_cached, use_plot_style,
+                   PASTEL_COLORS, instrumented, stage, write_report)
 
 def calculate_entropy(y):
     """Calculate entropy of a target variable."""
@@ -39,7 +35,15 @@ def calculate_information_gain(X, y, feature):
     
     return entropy_parent - weighted_entropy
 
+@instrumented
 def feature_selection_measures():
+    # Imported here: the entropy / Gini helpers above are also imported on
+    # their own (e.g. by the benchmarks) and need neither sklearn nor pyplot
+    from sklearn.tree import DecisionTreeClassifier
+    from sklearn.preprocessing import LabelEncoder
+    use_plot_style()
+    import matplotlib.pyplot as plt
+    
     # Setup paths
     data_dir, output_dir, plots_dir, tables_dir = setup_paths()
     
@@ -48,7 +52,9 @@ def feature_selection_measures():
     calculations_dir.mkdir(exist_ok=True)
     
     # Read the dataset
-    df = pd.read_csv(data_dir / 'avocado.csv')
+    with stage('read_avocado') as s:
+        df = read_csv_cached(data_dir / 'avocado.csv')
+        s.rows_out = len(df)
     
     # Prepare the data
     # Using 'type' as target variable and numerical features for analysis
@@ -163,7 +169,7 @@ def feature_selection_measures():
         ax.set_xticklabels(results_df['Feature'], rotation=45, ha='right')
     
     plt.tight_layout()
-    save_plot(plt, 'q9_feature_selection_measures.png', plots_dir)
+    save_plot(plt, 'q9_feature_selection_measures.png', plots_dir, data=results_df, source=__file__)
     
     # Using sklearn's DecisionTreeClassifier for feature importance
     dt = DecisionTreeClassifier(random_state=42)
@@ -214,7 +220,9 @@ def feature_selection_measures():
     plt.title('Feature Importance using Decision Tree')
     plt.xlabel('Importance')
     plt.tight_layout()
-    save_plot(plt, 'q9_feature_importance.png', plots_dir)
+    save_plot(plt, 'q9_feature_importance.png', plots_dir, data=importance, source=__file__)
 
 if __name__ == '__main__':
     feature_selection_measures()
+    # Per-stage timing / memory report (only with STAGE_PROFILE=1)
+    write_report('q9', setup_paths()[1] / 'profiles')
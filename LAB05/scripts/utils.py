@@ -1,20 +1,46 @@
+import sys
 import pandas as pd
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 from pathlib import Path
 
-# Set style for all plots
-plt.style.use('default')  # Using default style instead of seaborn
-# Set figure aesthetics for better visualization
-plt.rcParams['figure.facecolor'] = 'white'
-plt.rcParams['axes.facecolor'] = 'white'
-plt.rcParams['axes.grid'] = True
-plt.rcParams['grid.alpha'] = 0.3
+# Helpers shared with LAB04 live in the labtools package at the repository root
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from labtools.cache import cached_load
+from labtools.instrumentation import instrumented, stage, write_report  # noqa: F401
+from labtools import render_cache
+from labtools.table_io import write_table
+
+_plot_style_applied = False
+
+def use_plot_style():
+    """
+    Select the Agg backend and apply the shared plot style (once).
+
+    matplotlib is only imported here, so tools that never plot (e.g.
+    generate_synthetic_avocado.py) start without loading it. Scripts call
+    it before drawing; save_plot and new_figure call it as well.
+    """
+    global _plot_style_applied
+    if _plot_style_applied:
+        return
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    # Set style for all plots
+    plt.style.use('default')  # Using default style instead of seaborn
+    # Set figure aesthetics for better visualization
+    plt.rcParams['figure.facecolor'] = 'white'
+    plt.rcParams['axes.facecolor'] = 'white'
+    plt.rcParams['axes.grid'] = True
+    plt.rcParams['grid.alpha'] = 0.3
+    _plot_style_applied = True
 
 PASTEL_COLORS = ['#FFB3BA', '#BAFFC9', '#BAE1FF', '#FFFFBA', '#FFB3F7', '#B3F7FF']
 
+# Parsed copies of the input CSVs (see read_csv_cached) and render records (see save_plot)
+CACHE_DIR = Path(__file__).parent.parent / 'data' / '.cache'
+RENDER_DIR = str(CACHE_DIR / 'render')
+
 def setup_paths():
     base_dir = Path(__file__).parent.parent
     data_dir = base_dir / 'data'
@@ -28,22 +54,62 @@ def setup_paths():
     
     return data_dir, output_dir, plots_dir, tables_dir
 
-def save_plot(plt, filename, plots_dir):
-    plt.savefig(plots_dir / filename, dpi=300, bbox_inches='tight')
-    plt.close()
+def new_figure(figsize):
+    """
+    A Figure with its own Agg canvas and one Axes, outside pyplot.
+
+    Nothing is registered in pyplot's figure list, so figures can be drawn
+    from several threads or processes at once and need no `plt.close`.
+    """
+    use_plot_style()
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
 
-def save_table(df, filename, tables_dir, plots_dir=None):
-    # Save as CSV
-    df.to_csv(tables_dir / filename, index=False)
+def save_plot(plt, filename, plots_dir, data=None, source=None):
+    """
+    Save the current pyplot figure (or a Figure from new_figure) at 300 dpi.
+
+    With `data` (the values the chart was drawn from) and `source` (the
+    path of the script drawing it, i.e. its `__file__`), the render is
+    keyed by a hash of that data, the script's source (titles, colours,
+    sizes) with the project modules it imports and the matplotlib version;
+    savefig is skipped when the existing file was written from the same key.
+    """
+    if data is not None and source is None:
+        raise ValueError('save_plot with data= also needs source= (the drawing script, e.g. __file__)')
+    use_plot_style()
+    from matplotlib.figure import Figure
+    outpath = plots_dir / filename
+    fig = plt if isinstance(plt, Figure) else plt.gcf()
+    key = None
+    if data is not None and render_cache.ENABLED:
+        key = render_cache.script_key(data, outpath, source)
+    if key is None or not render_cache.is_current(outpath, key, RENDER_DIR):
+        fig.savefig(outpath, dpi=300, bbox_inches='tight')
+        if key is not None:
+            render_cache.record(outpath, key, RENDER_DIR)
+    if fig is not plt:
+        plt.close(fig)
+
+def save_table(df, filename, tables_dir, plots_dir=None, full_dataset=False):
+    # Full-dataset outputs follow TABLE_FORMAT (see labtools.table_io); summaries stay CSV
+    write_table(df, str(tables_dir / filename), None if full_dataset else 'csv')
     
-    # If plots_dir is provided, also save as image
-    if plots_dir is not None:
+    # If plots_dir is provided, also save as image (unless already rendered from this data)
+    img_path = plots_dir / filename.replace('.csv', '.png') if plots_dir is not None else None
+    key = None
+    if img_path is not None and render_cache.ENABLED:
+        key = render_cache.script_key(df, img_path, __file__)
+    if img_path is not None and (key is None or not render_cache.is_current(img_path, key, RENDER_DIR)):
         # Create figure with no margins
-        plt.figure(figsize=(max(8, len(df.columns) * 2), max(6, len(df) * 0.3)))
-        plt.axis('off')
+        fig, ax = new_figure((max(8, len(df.columns) * 2), max(6, len(df) * 0.3)))
+        ax.axis('off')
         
         # Create table with clean style
-        table = plt.table(
+        table = ax.table(
             cellText=df.values,
             colLabels=df.columns,
             cellLoc='center',
@@ -67,6 +133,17 @@ def save_table(df, filename, tables_dir, plots_dir=None):
                 cell.set_facecolor('white')
         
         # Save table as image
-        img_filename = filename.replace('.csv', '.png')
-        plt.savefig(plots_dir / img_filename, dpi=300, bbox_inches='tight', pad_inches=0.5)
-        plt.close()
+        fig.savefig(img_path, dpi=300, bbox_inches='tight', pad_inches=0.5)
+        if key is not None:
+            render_cache.record(img_path, key, RENDER_DIR)
+
+def read_csv_cached(path, **read_csv_kwargs):
+    """
+    pd.read_csv through the columnar cache shared with LAB04 (labtools.cache).
+
+    The first call parses the CSV and stores the typed frame as .npy columns
+    under data/.cache; later calls memory-map those columns instead of
+    re-parsing. Editing the CSV changes its hash, so the cache is rebuilt
+    automatically.
+    """
+    return cached_load(pd.read_csv, str(path), cache_dir=str(CACHE_DIR), **read_csv_kwargs)
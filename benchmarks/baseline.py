@@ -0,0 +1,81 @@
+"""
+Results files, baselines and regression checks shared by the benchmark scripts.
+
+A run is a dict {"meta": {...}, "results": [...]} where every result has a
+"wall_s" entry plus the fields identifying it (e.g. kernel and n). Runs
+are written to results/; one run per machine can be stored as baseline
+and later runs are compared with it entry by entry.
+"""
+
+import json
+import os
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+def add_arguments(parser, baseline_path, prefix=""):
+    """Add the --output, --baseline, --save-baseline and --threshold options."""
+    parser.add_argument("--output", help=f"results JSON path (default results/{prefix}<timestamp>.json)")
+    parser.add_argument("--baseline", default=baseline_path)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="relative slowdown reported as a regression")
+
+def compare(results, baseline, threshold, key):
+    """
+    Compare results with a baseline run.
+
+    Args:
+        key: Names of the fields identifying an entry, e.g. ("kernel", "n")
+
+    Returns:
+        List of (key values, ratio, regressed) for every entry present in
+        both, where ratio is new wall time / baseline wall time
+    """
+    base = {tuple(r[k] for k in key): r for r in baseline["results"]}
+    rows = []
+    for r in results:
+        ident = tuple(r[k] for k in key)
+        old = base.get(ident)
+        if old:
+            ratio = r["wall_s"] / old["wall_s"] if old["wall_s"] else float("inf")
+            rows.append((ident, ratio, ratio > 1 + threshold))
+    return rows
+
+def finish(run, args, key, label, prefix=""):
+    """
+    Write the run, then store it as the baseline or compare it with the stored one.
+
+    Args:
+        run: Run dict with "meta" and "results"
+        args: Parsed options from `add_arguments`
+        key: Fields identifying an entry (see `compare`)
+        label: Formats the key values of an entry for the comparison table
+        prefix: File name prefix of the results file
+
+    Returns:
+        Exit status: 1 if any entry regressed, else 0
+    """
+    output = args.output or os.path.join(RESULTS_DIR, prefix + time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(run, f, indent=2)
+    print("Results written to", output)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(run, f, indent=2)
+        print("Baseline saved to", args.baseline)
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --save-baseline to store one.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(run["results"], baseline, args.threshold, key)
+    print(f"\nCompared with baseline from {baseline['meta']['timestamp']}:")
+    for ident, ratio, regressed in rows:
+        print(f"{label(*ident)}  x{ratio:6.2f}{'  REGRESSION' if regressed else ''}")
+    return 1 if any(regressed for _, _, regressed in rows) else 0
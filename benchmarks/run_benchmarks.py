@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for the data-processing kernels of LAB04 and LAB05.
+
+Every kernel runs on growing synthetic inputs. For each (kernel, size) the
+suite records the best wall time over a few repeats, the throughput in rows
+per second and the peak traced memory of one extra run, and writes them to
+a JSON results file. With a stored baseline, slowdowns beyond a threshold
+are reported as regressions and make the run exit with status 1.
+
+Usage:
+  python benchmarks/run_benchmarks.py                      # run and compare
+  python benchmarks/run_benchmarks.py --save-baseline      # store as baseline (per machine)
+  python benchmarks/run_benchmarks.py --sizes 10000 100000 --only smooth
+"""
+
+import argparse
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import baseline
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, "LAB04"))
+sys.path.append(os.path.join(ROOT, "LAB05", "scripts"))
+
+from src.data_processing.binning import (equal_frequency_bins, smooth_all, smooth_by_mean,
+                                       smooth_by_median, smooth_by_boundaries)
+from src.data_processing.normalization import (minmax_scaling, zscore_scaling,
+                                             decimal_scaling, robust_scaling)
+from src.data_processing.avocado_processing import get_time_aggregations, impute_by_region_mean
+from q9_feature_selection import (calculate_entropy, calculate_gini,
+                                  calculate_information_gain)
+
+BASELINE_PATH = os.path.join(baseline.BENCH_DIR, "baseline.json")
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+
+def make_avocado_frame(n, rng):
+    """Preprocessed-avocado-like frame: weekly dates, 54 regions, 2 types, 1% missing prices."""
+    weeks = pd.date_range("2015-01-04", periods=169, freq="7D")
+    regions = np.array([f"region{i:02d}" for i in range(54)], dtype=object)
+    price = rng.normal(1.4, 0.4, n).clip(0.3)
+    price[rng.random(n) < 0.01] = np.nan
+    return pd.DataFrame({
+        "date": weeks[rng.integers(len(weeks), size=n)],
+        "region": regions[rng.integers(len(regions), size=n)],
+        "type": np.where(rng.random(n) < 0.5, "conventional", "organic"),
+        "averageprice": price,
+        "total_volume": rng.lognormal(11, 2, n),
+    })
+
+def _binned(n, rng):
+    values = rng.lognormal(11, 2, n)
+    labels, _ = equal_frequency_bins(values, min(250, n), return_labels=True)
+    return values, labels
+
+def _features(n, rng):
+    # q9 input: a 5-quantile binned feature and an encoded two-class target
+    feature = pd.qcut(pd.Series(rng.lognormal(11, 2, n)), q=5,
+                      labels=["q1", "q2", "q3", "q4", "q5"])
+    return feature, rng.integers(2, size=n)
+
+# name -> (setup(n, rng) -> args, kernel(*args))
+KERNELS = {
+    "equal_frequency_bins": (lambda n, rng: (rng.lognormal(11, 2, n), min(250, n)),
+                             lambda v, k: equal_frequency_bins(v, k, return_labels=True)),
+    "smooth_by_mean": (_binned, smooth_by_mean),
+    "smooth_by_median": (_binned, smooth_by_median),
+    "smooth_by_boundaries": (_binned, smooth_by_boundaries),
+    "smooth_all": (_binned, smooth_all),
+    "minmax_scaling": (lambda n, rng: (rng.normal(size=n),), minmax_scaling),
+    "zscore_scaling": (lambda n, rng: (rng.normal(size=n),), zscore_scaling),
+    "decimal_scaling": (lambda n, rng: (rng.normal(size=n) * 1e4,), decimal_scaling),
+    "robust_scaling": (lambda n, rng: (rng.normal(size=n),), robust_scaling),
+    "get_time_aggregations": (lambda n, rng: (make_avocado_frame(n, rng),), get_time_aggregations),
+    "impute_by_region_mean": (lambda n, rng: (make_avocado_frame(n, rng),), impute_by_region_mean),
+    "calculate_entropy": (lambda n, rng: (_features(n, rng)[0],), calculate_entropy),
+    "calculate_gini": (lambda n, rng: (_features(n, rng)[0],), calculate_gini),
+    "calculate_information_gain": (
+        lambda n, rng: (lambda f, y: (pd.DataFrame({"feature": f}), y, "feature"))(*_features(n, rng)),
+        calculate_information_gain),
+}
+
+def run_kernel(name, n, repeat=3, seed=0):
+    """
+    Benchmark one kernel at one input size.
+
+    Returns:
+        Dict with kernel, n, wall_s (best of `repeat`), throughput (rows/s)
+        and peak_mb (peak traced allocation of one run)
+    """
+    setup, kernel = KERNELS[name]
+    args = setup(n, np.random.default_rng(seed))
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        kernel(*args)
+        times.append(time.perf_counter() - start)
+    # Memory is traced in a separate run since tracing slows allocations down
+    tracemalloc.start()
+    kernel(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    wall = min(times)
+    return {"kernel": name, "n": n, "wall_s": wall, "throughput": n / wall if wall else float("inf"),
+            "peak_mb": peak / 2**20}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data-processing kernels.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--only", nargs="+", help="run kernels whose name contains any of these")
+    parser.add_argument("--repeat", type=int, default=3)
+    baseline.add_arguments(parser, BASELINE_PATH)
+    args = parser.parse_args()
+
+    names = [k for k in KERNELS if not args.only or any(s in k for s in args.only)]
+    results = []
+    for name in names:
+        for n in args.sizes:
+            r = run_kernel(name, n, args.repeat)
+            results.append(r)
+            print(f"{name:28s} n={n:>10,}  {r['wall_s'] * 1e3:10.2f} ms  "
+                  f"{r['throughput']:14,.0f} rows/s  {r['peak_mb']:9.1f} MB")
+
+    run = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.platform(),
+        },
+        "results": results,
+    }
+    return baseline.finish(run, args, ("kernel", "n"), lambda kernel, n: f"{kernel:28s} n={n:>10,}")
+
+if __name__ == "__main__":
+    sys.exit(main())
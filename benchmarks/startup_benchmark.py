@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Startup-time benchmark for the LAB04 / LAB05 modules and scripts.
+
+Every target is a short Python invocation (mostly a bare import) run in a
+fresh interpreter, so it measures what a small CLI call pays before doing
+any work. For each target the suite records the best and median wall time
+over a few runs and the heaviest third-party / standard-library packages
+it imports, from `python -X importtime`. Results, baseline and regression
+threshold are handled by baseline.py, as in run_benchmarks.py.
+
+Usage:
+  python benchmarks/startup_benchmark.py                   # run and compare
+  python benchmarks/startup_benchmark.py --save-baseline   # store as baseline (per machine)
+  python benchmarks/startup_benchmark.py --only lab05 --repeat 10
+"""
+
+import argparse
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import baseline
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAB04 = os.path.join(ROOT, "LAB04")
+LAB05_SCRIPTS = os.path.join(ROOT, "LAB05", "scripts")
+
+BASELINE_PATH = os.path.join(baseline.BENCH_DIR, "startup_baseline.json")
+
+# Where the lab modules live; their imports are the targets, not the cost being tracked
+PROJECT_DIRS = (ROOT, LAB04, os.path.join(LAB04, "scripts"), LAB05_SCRIPTS)
+
+# The LAB04 modules import the shared labtools package from the repository root
+ENV = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+
+# name -> (working directory, interpreter arguments)
+TARGETS = {
+    "interpreter": (ROOT, ["-c", "pass"]),
+    "lab04.config": (LAB04, ["-c", "import src.utils.config"]),
+    "lab04.avocado_processing": (LAB04, ["-c", "import src.data_processing.avocado_processing"]),
+    "lab04.pipeline": (LAB04, ["-c", "import src.utils.pipeline"]),
+    "lab04.plotting": (LAB04, ["-c", "import src.visualization.plotting"]),
+    "lab04.q2_script": (LAB04, ["-c", "import sys; sys.path.insert(0, 'scripts'); import q2_avocado_analysis"]),
+    "lab05.utils": (LAB05_SCRIPTS, ["-c", "import utils"]),
+    "lab05.q9_feature_selection": (LAB05_SCRIPTS, ["-c", "import q9_feature_selection"]),
+    "lab05.generate_synthetic --help": (LAB05_SCRIPTS, ["generate_synthetic_avocado.py", "--help"]),
+}
+
+def _run(cwd, args, extra=()):
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, *extra, *args], cwd=cwd, env=ENV, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed in {cwd}:\n{proc.stderr}")
+    return wall, proc.stderr
+
+def _is_project(package):
+    return any(os.path.exists(os.path.join(d, package)) or os.path.exists(os.path.join(d, package + ".py"))
+               for d in PROJECT_DIRS)
+
+def top_imports(stderr, n=5):
+    """
+    Heaviest imported packages from `-X importtime` output as (package, ms) pairs.
+
+    Every package is reported at the depth it is first imported (pandas
+    usually under a lab module, not at top level), with the cumulative
+    time of that import, which includes dependencies it loads first. The
+    lab modules themselves are left out: their total is the wall time.
+    """
+    rows = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        module = module.strip()
+        # The package's own line, not those of its submodules
+        if "." in module or _is_project(module):
+            continue
+        rows[module] = max(rows.get(module, 0), int(cumulative) / 1e3)
+    return sorted(rows.items(), key=lambda r: r[1], reverse=True)[:n]
+
+def run_target(name, repeat=5):
+    """
+    Time one target.
+
+    Returns:
+        Dict with target, wall_s (best of `repeat`), median_s and top_imports
+    """
+    cwd, args = TARGETS[name]
+    _run(cwd, args)  # warm the OS file cache and the bytecode caches
+    times = [_run(cwd, args)[0] for _ in range(repeat)]
+    _, stderr = _run(cwd, args, extra=("-X", "importtime"))
+    return {"target": name, "wall_s": min(times), "median_s": statistics.median(times),
+            "top_imports": top_imports(stderr)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the startup time of the lab modules.")
+    parser.add_argument("--only", nargs="+", help="run targets whose name contains any of these")
+    parser.add_argument("--repeat", type=int, default=5)
+    baseline.add_arguments(parser, BASELINE_PATH, prefix="startup-")
+    args = parser.parse_args()
+
+    names = [t for t in TARGETS if not args.only or any(s in t for s in args.only)]
+    results = []
+    for name in names:
+        r = run_target(name, args.repeat)
+        results.append(r)
+        heaviest = ", ".join(f"{m} {ms:.0f} ms" for m, ms in r["top_imports"][:3])
+        print(f"{name:34s} {r['wall_s'] * 1e3:8.1f} ms  (median {r['median_s'] * 1e3:8.1f} ms)  {heaviest}")
+
+    run = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.platform(),
+        },
+        "results": results,
+    }
+    return baseline.finish(run, args, ("target",), lambda target: f"{target:34s}", prefix="startup-")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+"""
+Helpers shared by the lab projects (LAB04, LAB05).
+
+- cache: columnar cache of parsed input files (`cached_load`)
+- table_io: full-dataset output tables in the configured TABLE_FORMAT
+- instrumentation: per-stage wall time / CPU / memory reports (STAGE_PROFILE)
+- digest: content hashes of values and of the project sources code depends on
+- render_cache: skipping plots whose data and drawing code are unchanged
+
+The directory holding this package must be on sys.path; the lab scripts
+add the repository root themselves.
+"""
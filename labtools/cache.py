@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents, read in chunks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _source_digest(path, cache_dir):
+    """File digest, reusing the last one while the file's size and mtime are unchanged."""
+    st = os.stat(path)
+    stamp = [st.st_size, st.st_mtime_ns]
+    index_path = os.path.join(cache_dir, "sources.json")
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+    entry = index.get(os.path.abspath(path))
+    if entry and entry["stamp"] == stamp:
+        return entry["digest"]
+    digest = file_digest(path)
+    index[os.path.abspath(path)] = {"stamp": stamp, "digest": digest}
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(index_path, "w") as f:
+        json.dump(index, f, indent=2)
+    return digest
+
+def write_frame(df, directory):
+    """
+    Write a DataFrame as one .npy file per column plus a meta.json.
+
+    Nullable Int/Float/boolean columns are stored as their values plus a
+    separate missing-value mask. Raises ValueError or TypeError for columns
+    the format cannot store without pickling or losing their type (object
+    columns of unhashable or non-JSON values, ...).
+    """
+    os.makedirs(directory, exist_ok=True)
+    meta = {"columns": [], "index": None}
+    for i, (name, col) in enumerate(df.items()):
+        entry = {"name": name, "dtype": str(col.dtype), "file": f"c{i}.npy"}
+        if isinstance(col.dtype, pd.api.extensions.ExtensionDtype) and col.dtype.kind in "biuf":
+            # Values (zero where missing) plus the missing-value mask
+            entry["kind"] = "masked"
+            entry["mask"] = f"m{i}.npy"
+            values = col.to_numpy(dtype=col.dtype.numpy_dtype, na_value=0)
+            np.save(os.path.join(directory, entry["mask"]), col.isna().to_numpy(), allow_pickle=False)
+        elif isinstance(col.dtype, pd.CategoricalDtype) or col.dtype.kind not in "biufcmM":
+            # Strings and categoricals are stored as integer codes + categories
+            cat = col if isinstance(col.dtype, pd.CategoricalDtype) else col.astype("category")
+            entry["kind"] = "category"
+            entry["categories"] = cat.cat.categories.tolist()
+            entry["ordered"] = bool(cat.cat.ordered)
+            values = cat.cat.codes.to_numpy()
+        elif col.dtype.kind == "M":
+            entry["kind"] = "datetime"
+            values = col.to_numpy().view(np.int64)
+        else:
+            entry["kind"] = "numeric"
+            values = col.to_numpy()
+        np.save(os.path.join(directory, entry["file"]), values, allow_pickle=False)
+        meta["columns"].append(entry)
+    if not isinstance(df.index, pd.RangeIndex) or df.index.start != 0 or df.index.step != 1:
+        np.save(os.path.join(directory, "index.npy"), df.index.to_numpy(), allow_pickle=False)
+        meta["index"] = "index.npy"
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+def read_frame(directory, mmap=True):
+    """Read a frame written by `write_frame`, memory-mapping the column files."""
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    # Copy-on-write maps: pages are shared with the cache file until modified
+    mode = "c" if mmap else None
+    data = {}
+    for entry in meta["columns"]:
+        values = np.load(os.path.join(directory, entry["file"]), mmap_mode=mode)
+        if entry["kind"] == "category":
+            cat = pd.Categorical.from_codes(values, categories=entry["categories"],
+                                            ordered=entry["ordered"])
+            col = pd.Series(cat)
+            data[entry["name"]] = col if entry["dtype"] == "category" else col.astype(entry["dtype"])
+        elif entry["kind"] == "datetime":
+            data[entry["name"]] = pd.Series(values.view(entry["dtype"]))
+        elif entry["kind"] == "masked":
+            mask = np.load(os.path.join(directory, entry["mask"]), mmap_mode=mode)
+            array_type = pd.api.types.pandas_dtype(entry["dtype"]).construct_array_type()
+            data[entry["name"]] = pd.Series(array_type(values, mask))
+        else:
+            data[entry["name"]] = values
+    df = pd.DataFrame(data, copy=False)
+    if meta["index"]:
+        df.index = np.load(os.path.join(directory, meta["index"]))
+    return df
+
+def _entry_prefix(file_path):
+    # Source file name plus a hash of its location, so that equally named
+    # files in different directories keep separate entries
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    location = hashlib.sha256(os.path.abspath(file_path).encode()).hexdigest()[:8]
+    return f"{stem}-{location}"
+
+def _legacy_entry(file_path):
+    # Entry names from before the location hash: "<stem>-<digest>-<key>"
+    stem = os.path.splitext(os.path.basename(file_path))[0]
+    return re.compile(rf"{re.escape(stem)}-[0-9a-f]{{16}}-[0-9a-f]{{16}}")
+
+def cached_load(loader, file_path, cache_dir, **options):
+    """
+    Load `file_path` with `loader(file_path, **options)` through a columnar cache.
+
+    The cache entry under `cache_dir` is keyed by the SHA-256 of the source
+    file, the loader's name and its options, so editing the CSV or changing
+    the options automatically misses the cache; entries built from an older
+    version of the same file (and entries left in the older naming scheme)
+    are removed when a new one is written. Frames the cache cannot store
+    (see `write_frame`) are returned uncached.
+    """
+    digest = _source_digest(file_path, cache_dir)
+    loader_name = f"{loader.__module__}.{loader.__qualname__}"
+    key_src = json.dumps([loader_name, sorted(options.items())], default=str)
+    key = hashlib.sha256(key_src.encode()).hexdigest()[:16]
+    prefix = _entry_prefix(file_path)
+    entry_dir = os.path.join(cache_dir, f"{prefix}-{digest[:16]}-{key}")
+
+    if os.path.exists(os.path.join(entry_dir, "meta.json")):
+        return read_frame(entry_dir)
+
+    df = loader(file_path, **options)
+    # Write to a temporary directory first so readers never see a partial entry
+    tmp_dir = tempfile.mkdtemp(prefix=f".{prefix}-", dir=cache_dir)
+    try:
+        write_frame(df, tmp_dir)
+    except (ValueError, TypeError):
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        return df
+    legacy = _legacy_entry(file_path)
+    for name in os.listdir(cache_dir):
+        # Entries built from an older version of the same source file, or
+        # named in the format without the location hash
+        stale = name.startswith(f"{prefix}-") and not name.startswith(f"{prefix}-{digest[:16]}-")
+        if stale or legacy.fullmatch(name):
+            shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+    try:
+        os.replace(tmp_dir, entry_dir)
+    except OSError:
+        # Another process published the same entry first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return read_frame(entry_dir)
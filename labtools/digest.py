@@ -0,0 +1,123 @@
+import ast
+import functools
+import hashlib
+import importlib.util
+import inspect
+import os
+import pickle
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Sources of this package count as project code for every user
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def value_digest(value):
+    """Content hash of a stage input (DataFrame, Series, array, sequence of them or picklable value)."""
+    h = hashlib.sha256()
+    _update_digest(h, value)
+    return h.hexdigest()
+
+def _update_digest(h, value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        h.update(repr(value.dtypes if isinstance(value, pd.DataFrame) else value.dtype).encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        h.update(f"{value.dtype}{value.shape}".encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _update_digest(h, item)
+    else:
+        h.update(pickle.dumps(value))
+
+def _under(path, roots):
+    return bool(path) and path.endswith(".py") and os.path.abspath(path).startswith(roots)
+
+@functools.lru_cache(maxsize=None)
+def _project_file(name, roots):
+    """Source file of module `name` if it lives under one of `roots`, else None."""
+    try:
+        # Check the top-level package first so third-party packages are never imported
+        top = importlib.util.find_spec(name.partition(".")[0])
+        if top is None or not _under(top.origin, roots):
+            return None
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+    return spec.origin if spec is not None and _under(spec.origin, roots) else None
+
+def _imported_names(path, package):
+    """Modules a source file imports (at any depth, including function-level imports)."""
+    return _parse_imports(path, package, os.stat(path).st_mtime_ns)
+
+@functools.lru_cache(maxsize=None)
+def _parse_imports(path, package, mtime_ns):
+    # mtime_ns is part of the cache key only, so an edited file is parsed again
+    with open(path, "rb") as f:
+        tree = ast.parse(f.read(), path)
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            try:
+                base = importlib.util.resolve_name("." * node.level + (node.module or ""), package)
+            except (ImportError, ValueError):
+                continue
+            # "from pkg import name" may import the submodule pkg.name
+            names = [base] + [f"{base}.{alias.name}" for alias in node.names]
+        else:
+            continue
+        for name in names:
+            # Importing a.b.c also runs the packages a and a.b
+            parts = name.split(".")
+            found.update(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+    return sorted(found)
+
+def project_sources(path, package=None, roots=()):
+    """
+    Project source files `path` depends on, following imports transitively.
+
+    Modules count as project sources when they live in this package, the
+    directory of `path` or one of `roots`; everything else (the standard
+    library, third-party packages) is left out.
+
+    Returns:
+        Sorted list of file paths, including `path` itself
+    """
+    path = os.path.abspath(path)
+    roots = tuple(os.path.abspath(r) + os.sep for r in (PACKAGE_DIR, os.path.dirname(path), *roots))
+    seen = set()
+    pending = [(path, package or "")]
+    while pending:
+        path, package = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        for name in _imported_names(path, package):
+            source = _project_file(name, roots)
+            if source and source not in seen:
+                # Relative imports in a package's __init__ resolve against the package itself
+                pending.append((source, name if os.path.basename(source) == "__init__.py"
+                                else name.rpartition(".")[0]))
+    return sorted(seen)
+
+def code_digest(func, roots=()):
+    """
+    Hash of the source files a function depends on.
+
+    Covers the module defining `func` and every project module it imports,
+    directly or through other project modules (see `project_sources` for
+    `roots`), so editing e.g. config.py or a helper one call level down
+    invalidates the results computed by `func`.
+    """
+    func = inspect.unwrap(func)
+    module = sys.modules[func.__module__]
+    h = hashlib.sha256()
+    for path in project_sources(module.__file__, module.__package__, roots):
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
@@ -0,0 +1,140 @@
+import csv
+import functools
+import json
+import os
+import time
+import tracemalloc
+
+# Set STAGE_PROFILE=1 to record stages; when unset the hooks are no-ops.
+# STAGE_PROFILE=time skips memory tracing, which slows allocation-heavy code
+ENABLED = os.environ.get("STAGE_PROFILE", "") not in ("", "0")
+TRACE_MEMORY = ENABLED and os.environ.get("STAGE_PROFILE") != "time"
+
+REPORT_FIELDS = ["stage", "wall_s", "cpu_s", "peak_mb", "rows_in", "rows_out", "pid"]
+
+_records = []
+_stack = []
+
+def _rows(value):
+    """Row count of a DataFrame/Series/array result, None for anything else."""
+    shape = getattr(value, "shape", None)
+    return int(shape[0]) if shape else None
+
+class stage:
+    """
+    Record wall time, CPU time and peak traced memory of a block of code.
+
+    Use as a context manager (`with stage("load") as s: ...; s.rows_out = n`)
+    or through the `instrumented` decorator. Nested stages are recorded
+    separately and their peaks still count towards the enclosing stage.
+    Does nothing unless instrumentation is enabled.
+
+    Args:
+        name: Stage name in the report
+        rows_in: Optional number of input rows
+    """
+
+    def __init__(self, name, rows_in=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self._peak = 0
+
+    def __enter__(self):
+        if not ENABLED:
+            return self
+        self._base = 0
+        if TRACE_MEMORY:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            current, peak = tracemalloc.get_traced_memory()
+            if _stack:
+                # Keep the parent's peak before resetting it for this stage
+                _stack[-1]._peak = max(_stack[-1]._peak, peak - _stack[-1]._base)
+            tracemalloc.reset_peak()
+            self._base = current
+        _stack.append(self)
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not ENABLED:
+            return False
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        _stack.pop()
+        if TRACE_MEMORY:
+            _, peak = tracemalloc.get_traced_memory()
+            self._peak = max(self._peak, peak - self._base)
+            if _stack:
+                parent = _stack[-1]
+                parent._peak = max(parent._peak, self._peak + self._base - parent._base)
+            else:
+                tracemalloc.stop()
+        _records.append({
+            "stage": self.name,
+            "wall_s": wall,
+            "cpu_s": cpu,
+            "peak_mb": self._peak / 2**20 if TRACE_MEMORY else None,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "pid": os.getpid(),
+        })
+        return False
+
+def instrumented(func=None, *, name=None):
+    """
+    Decorator recording each call of `func` as a stage.
+
+    Input rows are taken from the first argument and output rows from the
+    return value when they have a shape (DataFrames, Series, arrays).
+    """
+    if func is None:
+        return functools.partial(instrumented, name=name)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not ENABLED:
+            return func(*args, **kwargs)
+        with stage(name or func.__name__, _rows(args[0]) if args else None) as s:
+            result = func(*args, **kwargs)
+            s.rows_out = _rows(result)
+        return result
+    return wrapper
+
+def records():
+    """Stages recorded so far in this process."""
+    return list(_records)
+
+def drain():
+    """Return and clear the recorded stages (e.g. to ship them from a worker)."""
+    out = list(_records)
+    _records.clear()
+    return out
+
+def extend(stages):
+    """Add stages recorded in another process."""
+    _records.extend(stages)
+
+def write_report(name, directory):
+    """
+    Write the recorded stages as `{name}_stages.json` and `{name}_stages.csv`.
+
+    Returns:
+        Tuple of the two paths, or None if instrumentation is disabled or
+        nothing was recorded
+    """
+    if not ENABLED or not _records:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    json_path = os.path.join(directory, f"{name}_stages.json")
+    csv_path = os.path.join(directory, f"{name}_stages.csv")
+    with open(json_path, "w") as f:
+        json.dump({"run": name, "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                   "stages": _records}, f, indent=2)
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(_records)
+    return json_path, csv_path
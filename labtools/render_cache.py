@@ -0,0 +1,110 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+from importlib.metadata import version
+
+from .digest import code_digest, project_sources, value_digest
+
+# RENDER_CACHE=0 redraws every plot
+ENABLED = os.environ.get("RENDER_CACHE", "1") != "0"
+
+@functools.lru_cache(maxsize=None)
+def _matplotlib_version():
+    # From the package metadata, so checking the cache does not import matplotlib
+    return version("matplotlib")
+
+def render_key(func, args, kwargs, roots=()):
+    """
+    Hash of everything that determines a chart: the plotted data, the
+    chart parameters (defaults included), the plotting code with the
+    project modules it imports (see `project_sources` for `roots`), and
+    the matplotlib version.
+    """
+    bound = inspect.signature(func).bind(*args, **kwargs)
+    # Defaults such as color=COLORS["alt2"] are fixed when the function is defined
+    bound.apply_defaults()
+    h = hashlib.sha256()
+    h.update(code_digest(func, roots).encode())
+    h.update(_matplotlib_version().encode())
+    for name, value in bound.arguments.items():
+        h.update(name.encode())
+        h.update(value_digest(value).encode())
+    return h.hexdigest()
+
+def script_key(data, outpath, source, roots=()):
+    """
+    Render key for a chart drawn inline by a script rather than by a `save_*` function.
+
+    Args:
+        data: The values the chart was drawn from
+        outpath: Output file; its name is part of the key
+        source: Path of the script drawing the chart (titles, colours and
+            sizes live in its code); it and the project modules it imports
+            are hashed
+        roots: Extra source roots of the script (see `project_sources`)
+    """
+    h = hashlib.sha256()
+    h.update(value_digest(data).encode())
+    h.update(os.path.basename(outpath).encode())
+    h.update(_matplotlib_version().encode())
+    for path in project_sources(source, roots=roots):
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+def _entry_path(outpath, cache_dir):
+    # One small entry per output, so parallel renders never share a file
+    name = hashlib.sha1(os.path.abspath(outpath).encode()).hexdigest()
+    return os.path.join(cache_dir, name + ".json")
+
+def is_current(outpath, key, cache_dir):
+    """True if `outpath` was rendered from `key` and has not changed since."""
+    try:
+        with open(_entry_path(outpath, cache_dir)) as f:
+            entry = json.load(f)
+        st = os.stat(outpath)
+    except (OSError, ValueError):
+        return False
+    return entry["key"] == key and entry["stamp"] == [st.st_size, st.st_mtime_ns]
+
+def record(outpath, key, cache_dir):
+    """Remember that `outpath` now holds the chart rendered from `key`."""
+    st = os.stat(outpath)
+    entry = {"path": os.path.abspath(outpath), "key": key, "stamp": [st.st_size, st.st_mtime_ns]}
+    entry_path = _entry_path(outpath, cache_dir)
+    os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+    tmp = f"{entry_path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(entry, f)
+    os.replace(tmp, entry_path)
+
+def cached_render(cache_dir, roots=()):
+    """
+    Decorator skipping a `save_*` plotting function when its output is already up to date.
+
+    The decorated function must take an `outpath` argument. The call is
+    skipped entirely (no drawing, no savefig) when `outpath` exists and
+    was last written by a call with the same `render_key`.
+
+    Args:
+        cache_dir: Directory of the render records
+        roots: Extra source roots of the plotting code (see `project_sources`)
+    """
+    def decorate(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            outpath = signature.bind(*args, **kwargs).arguments["outpath"]
+            key = render_key(func, args, kwargs, roots)
+            if is_current(outpath, key, cache_dir):
+                return None
+            result = func(*args, **kwargs)
+            record(outpath, key, cache_dir)
+            return result
+        return wrapper
+    return decorate
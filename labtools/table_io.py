@@ -0,0 +1,74 @@
+import os
+
+# Format of full-dataset output tables: csv, csv.gz, parquet or feather
+TABLE_FORMAT = os.environ.get("TABLE_FORMAT", "csv")
+
+# Output format -> file extension
+TABLE_FORMATS = {
+    "csv": ".csv",
+    "csv.gz": ".csv.gz",
+    "parquet": ".parquet",
+    "feather": ".feather",
+}
+
+def table_path(path, fmt=None):
+    """Replace the extension of `path` with the one of the output format."""
+    fmt = fmt or TABLE_FORMAT
+    if fmt not in TABLE_FORMATS:
+        raise ValueError(f"Unknown table format: {fmt} (expected one of {list(TABLE_FORMATS)})")
+    stem = path
+    for ext in sorted(TABLE_FORMATS.values(), key=len, reverse=True):
+        if stem.endswith(ext):
+            stem = stem[:-len(ext)]
+            break
+    return stem + TABLE_FORMATS[fmt]
+
+def _arrow_compatible(df):
+    """Write object columns that mix value types (e.g. numbers and strings) as text."""
+    mixed = [name for name, col in df.items()
+             if col.dtype == object and col.dropna().map(type).nunique() > 1]
+    if not mixed:
+        return df
+    df = df.copy()
+    for name in mixed:
+        df[name] = df[name].where(df[name].isna(), df[name].astype(str))
+    return df
+
+def write_table(df, path, fmt=None, index=False):
+    """
+    Write a DataFrame in the configured output format.
+
+    Parquet and Feather keep the column types (categoricals, datetimes,
+    float32) and are much faster to write and smaller than CSV; they need
+    pyarrow. "csv.gz" is a gzip-compressed CSV at a fast compression level.
+
+    Args:
+        df: DataFrame to write
+        path: Target path; its extension is replaced to match the format
+        fmt: "csv", "csv.gz", "parquet" or "feather" (default TABLE_FORMAT)
+        index: Whether to write the index
+
+    Returns:
+        The path actually written
+    """
+    fmt = fmt or TABLE_FORMAT
+    path = table_path(path, fmt)
+    if fmt in ("parquet", "feather"):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError(f"Writing {fmt} tables requires pyarrow "
+                              "(pip install pyarrow) or TABLE_FORMAT=csv") from e
+        # Arrow columns hold a single type
+        df = _arrow_compatible(df)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if fmt == "csv":
+        df.to_csv(path, index=index)
+    elif fmt == "csv.gz":
+        df.to_csv(path, index=index, compression={"method": "gzip", "compresslevel": 1, "mtime": 0})
+    elif fmt == "parquet":
+        df.to_parquet(path, index=index)
+    else:
+        # Feather stores no index; keep it as a column when requested
+        (df.reset_index() if index else df.reset_index(drop=True)).to_feather(path)
+    return path